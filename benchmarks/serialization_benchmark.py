@@ -0,0 +1,89 @@
+"""Serialization time and payload size for large /extract responses.
+
+Run from the project root:
+    python benchmarks/serialization_benchmark.py [locations]
+"""
+import gzip
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from models.schemas import LocationResult, ProcessPDFResponse, CompactProcessPDFResponse
+from services.location_service import LocationService
+from middleware.compression import brotli, CompressionMiddleware
+
+
+def build_locations(count: int):
+    rng = random.Random(42)
+    streets = ["Melrose St", "Clarendon St", "Tremont St", "Columbus Ave", "Myrtle St", "Union St"]
+    
+    locations = []
+    for i in range(count):
+        name = f"Location {i % 400} Park"
+        address = f"{rng.randint(1, 400)} {rng.choice(streets)}, Boston, MA 02116, USA" if i % 5 else "Not found"
+        query = address if address != "Not found" else name
+        locations.append(LocationResult(
+            page=i // 25 + 1,
+            location_name=name,
+            full_address=address,
+            linear_feet=round(rng.uniform(10, 2000), 1),
+            maps_url=LocationService.google_maps_url(query),
+        ))
+    return locations
+
+
+def default_path(response: ProcessPDFResponse) -> bytes:
+    validated = ProcessPDFResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(response: ProcessPDFResponse) -> bytes:
+    return response.model_dump_json().encode("utf-8")
+
+
+def compact_path(response: ProcessPDFResponse) -> bytes:
+    addresses, columns = LocationService.compact_locations(response.locations)
+    return CompactProcessPDFResponse(
+        success=True,
+        message=response.message,
+        total_locations=response.total_locations,
+        maps_url_prefix=LocationService.MAPS_SEARCH_URL,
+        addresses=addresses,
+        columns=columns,
+    ).model_dump_json().encode("utf-8")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    
+    response = ProcessPDFResponse(
+        success=True,
+        message=f"Successfully extracted {count} locations",
+        locations=build_locations(count),
+        total_locations=count,
+    )
+    
+    print(f"{count} locations")
+    paths = [
+        ("default (validate + jsonable_encoder)", default_path),
+        ("fast (model_dump_json)", fast_path),
+        ("compact columnar", compact_path),
+    ]
+    
+    header = f"  {'path':<40}{'ms':>9}{'raw KB':>10}{'gzip KB':>10}{'br KB':>10}"
+    print(header)
+    for label, path in paths:
+        elapsed = min(timeit.repeat(lambda: path(response), number=1, repeat=5))
+        body = path(response)
+        gz = len(gzip.compress(body, compresslevel=CompressionMiddleware.GZIP_LEVEL))
+        br = len(brotli.compress(body, quality=CompressionMiddleware.BROTLI_QUALITY)) if brotli else float("nan")
+        print(f"  {label:<40}{elapsed * 1000:9.2f}{len(body) / 1024:10.1f}{gz / 1024:10.1f}{br / 1024:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
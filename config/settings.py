@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "production"
     API_KEY: str = "your-secret-api-key-here"
     MODEL: str = "gpt-4o-mini"
+    MODEL_CASCADE: str = ""
+    MAX_LINEAR_FEET: float = 50000.0
     
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
@@ -16,6 +18,36 @@ class Settings(BaseSettings):
     MAX_PAGES: int = 30
     DEFAULT_ZOOM: float = 4.0
     
+    DEFAULT_DEADLINE_SECONDS: Optional[float] = None
+    DISCONNECT_POLL_INTERVAL: float = 0.5
+    MIN_PAGE_BUDGET_SECONDS: float = 5.0
+    
+    ADMISSION_MAX_BYTES: int = 1073741824
+    ADMISSION_MAX_QUEUE: int = 8
+    ADMISSION_QUEUE_TIMEOUT: float = 60.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+    
+    PAGE_CACHE_MAX_ENTRIES: int = 5000
+    
+    COMPRESSION_MIN_BYTES: int = 1024
+    
+    TOKEN_BUDGET_PER_JOB: Optional[int] = None
+    VISION_DETAIL: str = "auto"
+    
+    TEXT_LAYER_ENABLED: bool = True
+    TEXT_LAYER_MAX_LABEL_DISTANCE: float = 72.0
+    
+    JOBS_DB_PATH: str = "data/jobs.sqlite3"
+    JOB_TASK_TIMEOUT_SECONDS: float = 240.0
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 3
+    WORKER_POLL_INTERVAL: float = 1.0
+    
+    @property
+    def model_cascade(self) -> List[str]:
+        models = [model.strip() for model in self.MODEL_CASCADE.split(",") if model.strip()]
+        return models or [self.MODEL]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,3 +1,4 @@
 from .location_controller import LocationController
+from .job_controller import JobController
 
-__all__ = ["LocationController"]
+__all__ = ["LocationController", "JobController"]
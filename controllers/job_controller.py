@@ -0,0 +1,102 @@
+from typing import Optional, Union
+from fastapi import UploadFile, HTTPException, status
+from models.schemas import (
+    JobSubmissionResponse,
+    JobStatusResponse,
+    ProcessPDFResponse,
+    CompactProcessPDFResponse
+)
+from services.job_service import JobService
+from controllers.location_controller import LocationController
+from utils.logger import logger
+
+
+class JobController:
+    
+    def __init__(self):
+        self.service = JobService()
+    
+    async def submit_job(
+        self,
+        map_pdf: UploadFile,
+        routing_pdf: Optional[UploadFile] = None,
+        zoom: float = 4.0,
+        max_pages: int = 30,
+        token_budget: Optional[int] = None
+    ) -> JobSubmissionResponse:
+        try:
+            logger.info(f"Submitting extraction job - Map: {map_pdf.filename}")
+            
+            if map_pdf.content_type != "application/pdf":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Map file must be a PDF"
+                )
+            map_pdf_bytes = await map_pdf.read()
+            
+            routing_pdf_bytes = None
+            if routing_pdf:
+                if routing_pdf.content_type != "application/pdf":
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Routing file must be a PDF"
+                    )
+                routing_pdf_bytes = await routing_pdf.read()
+            
+            job = await self.service.submit(
+                map_pdf_bytes=map_pdf_bytes,
+                routing_pdf_bytes=routing_pdf_bytes,
+                zoom=zoom,
+                max_pages=max_pages,
+                token_budget=token_budget
+            )
+            return JobSubmissionResponse(
+                job_id=job.job_id,
+                status=job.status,
+                pages_total=job.pages_total,
+                status_url=f"/api/v1/jobs/{job.job_id}",
+                result_url=f"/api/v1/jobs/{job.job_id}/result"
+            )
+        
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Error submitting job: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error submitting job: {str(e)}"
+            )
+    
+    async def get_job_status(self, job_id: str) -> JobStatusResponse:
+        job = await self.service.get_status(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job {job_id} not found"
+            )
+        return job
+    
+    async def get_job_result(
+        self,
+        job_id: str,
+        result_format: str = "full"
+    ) -> Union[ProcessPDFResponse, CompactProcessPDFResponse]:
+        job = await self.get_job_status(job_id)
+        if job.status == "failed":
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Job failed: {job.error}"
+            )
+        
+        result = await self.service.get_result(job_id)
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is {job.status} - {job.pages_done} of {job.pages_total} pages done"
+            )
+        return LocationController.build_response(result, result_format)
@@ -1,22 +1,35 @@
-from typing import Optional
+from typing import Awaitable, Callable, Optional, Union
 from fastapi import UploadFile, HTTPException, status
-from models.schemas import ProcessPDFResponse
+from starlette.concurrency import run_in_threadpool
+from models.schemas import ExtractionResult, ProcessPDFResponse, CompactProcessPDFResponse, AdmissionStatsResponse
 from services.location_service import LocationService
+from services.admission_service import AdmissionService, AdmissionRejectedError
+from config.settings import get_settings
 from utils.logger import logger
+from utils.job_context import JobContext, JobCancelledError
+
+settings = get_settings()
+
+HTTP_499_CLIENT_CLOSED_REQUEST = 499
 
 
 class LocationController:
     
     def __init__(self):
         self.service = LocationService()
+        self.admission = AdmissionService()
     
     async def process_location_pdfs(
         self,
         map_pdf: UploadFile,
         routing_pdf: Optional[UploadFile] = None,
         zoom: float = 4.0,
-        max_pages: int = 30
-    ) -> ProcessPDFResponse:
+        max_pages: int = 30,
+        deadline_seconds: Optional[float] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        result_format: str = "full",
+        token_budget: Optional[int] = None
+    ) -> Union[ProcessPDFResponse, CompactProcessPDFResponse]:
         try:
             logger.info(f"Processing location PDFs - Map: {map_pdf.filename}")
             
@@ -38,35 +51,111 @@ class LocationController:
                 routing_pdf_bytes = await routing_pdf.read()
                 logger.info(f"Routing PDF provided: {routing_pdf.filename}")
             
-            locations = await self.service.process_pdfs(
-                map_pdf_bytes=map_pdf_bytes,
-                routing_pdf_bytes=routing_pdf_bytes,
-                zoom=zoom,
-                max_pages=max_pages
-            )
-            
-            if not locations:
-                logger.warning("No locations extracted from PDFs")
-                return ProcessPDFResponse(
-                    success=False,
-                    message="No locations detected. Try increasing zoom or check PDF quality.",
-                    locations=[],
-                    total_locations=0
+            async with JobContext(
+                deadline_seconds=deadline_seconds or settings.DEFAULT_DEADLINE_SECONDS,
+                is_disconnected=is_disconnected,
+                poll_interval=settings.DISCONNECT_POLL_INTERVAL,
+                min_page_seconds=settings.MIN_PAGE_BUDGET_SECONDS
+            ) as context:
+                estimated_bytes = await self._estimate_job_bytes(
+                    map_pdf_bytes, routing_pdf_bytes, zoom, max_pages
                 )
-            
-            logger.info(f"Successfully processed {len(locations)} locations")
-            return ProcessPDFResponse(
-                success=True,
-                message=f"Successfully extracted {len(locations)} locations",
-                locations=locations,
-                total_locations=len(locations)
-            )
+                async with self.admission.admit(estimated_bytes, context):
+                    result = await self.service.process_pdfs(
+                        map_pdf_bytes=map_pdf_bytes,
+                        routing_pdf_bytes=routing_pdf_bytes,
+                        zoom=zoom,
+                        max_pages=max_pages,
+                        context=context,
+                        token_budget=token_budget
+                    )
+            return self.build_response(result, result_format)
         
         except HTTPException:
             raise
+        except AdmissionRejectedError as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Server is at capacity: {str(e)}",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except JobCancelledError:
+            logger.warning(f"Client disconnected - abandoned processing of {map_pdf.filename}")
+            raise HTTPException(
+                status_code=HTTP_499_CLIENT_CLOSED_REQUEST,
+                detail="Client closed request"
+            )
         except Exception as e:
             logger.error(f"Error processing PDFs: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error processing PDFs: {str(e)}"
             )
+    
+    @staticmethod
+    def build_response(
+        result: ExtractionResult,
+        result_format: str = "full"
+    ) -> Union[ProcessPDFResponse, CompactProcessPDFResponse]:
+        locations = result.locations
+        success = bool(locations)
+        
+        if not locations:
+            logger.warning("No locations extracted from PDFs")
+            message = result.partial_reason or "No locations detected. Try increasing zoom or check PDF quality."
+        else:
+            logger.info(f"Successfully processed {len(locations)} locations")
+            message = f"Successfully extracted {len(locations)} locations"
+            if result.partial:
+                message = f"Partial result: extracted {len(locations)} locations. {result.partial_reason}"
+        
+        if result_format == "compact":
+            addresses, columns = LocationService.compact_locations(locations)
+            return CompactProcessPDFResponse(
+                success=success,
+                message=message,
+                total_locations=len(locations),
+                maps_url_prefix=LocationService.MAPS_SEARCH_URL,
+                addresses=addresses,
+                columns=columns,
+                **result.model_dump(exclude={"locations"})
+            )
+        
+        return ProcessPDFResponse(
+            success=success,
+            message=message,
+            locations=locations,
+            total_locations=len(locations),
+            **result.model_dump(exclude={"locations"})
+        )
+    
+    async def _estimate_job_bytes(
+        self,
+        map_pdf_bytes: bytes,
+        routing_pdf_bytes: Optional[bytes],
+        zoom: float,
+        max_pages: int
+    ) -> int:
+        if settings.ENVIRONMENT == "development":
+            return len(map_pdf_bytes) + len(routing_pdf_bytes or b"")
+        
+        input_bytes = 0
+        peak_render_bytes = 0
+        
+        for pdf_bytes in (map_pdf_bytes, routing_pdf_bytes):
+            if not pdf_bytes:
+                continue
+            estimate = await run_in_threadpool(
+                self.service.pdf_service.estimate_render_cost, pdf_bytes, zoom, max_pages
+            )
+            logger.info(
+                f"PDF cost estimate - pages: {estimate.pages}, "
+                f"peak pixels: {estimate.peak_pixels}, bytes: {estimate.estimated_bytes}"
+            )
+            input_bytes += len(pdf_bytes)
+            peak_render_bytes = max(peak_render_bytes, estimate.estimated_bytes - len(pdf_bytes))
+        
+        return input_bytes + peak_render_bytes
+    
+    def get_admission_stats(self) -> AdmissionStatsResponse:
+        return self.admission.stats()
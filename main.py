@@ -2,8 +2,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
-from middleware import APIKeyMiddleware, LoggingMiddleware
-from routes import location_router, health_router
+from middleware import APIKeyMiddleware, LoggingMiddleware, CompressionMiddleware, DisconnectMiddleware
+from routes import location_router, job_router, health_router
 from config.settings import get_settings
 from utils.logger import logger
 
@@ -32,6 +32,7 @@ app = FastAPI(
     - Match locations with addresses from routing PDFs
     - Generate Google Maps links for each location
     - Development mode with hardcoded data to save API costs
+    - Background jobs processed page by page by a pool of local worker processes
     
     ## Authentication
     All endpoints (except /health, /docs, /redoc) require an `X-API-Key` header.
@@ -59,11 +60,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(APIKeyMiddleware)
+app.add_middleware(DisconnectMiddleware)
 
 app.include_router(health_router)
 app.include_router(location_router)
+app.include_router(job_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,12 @@
 from .auth import APIKeyMiddleware
 from .logging import LoggingMiddleware
+from .compression import CompressionMiddleware
+from .disconnect import DisconnectMiddleware, client_disconnected
 
-__all__ = ["APIKeyMiddleware", "LoggingMiddleware"]
+__all__ = [
+    "APIKeyMiddleware",
+    "LoggingMiddleware",
+    "CompressionMiddleware",
+    "DisconnectMiddleware",
+    "client_disconnected"
+]
@@ -0,0 +1,76 @@
+import gzip
+from typing import Optional
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from config.settings import get_settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+settings = get_settings()
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    
+    COMPRESSIBLE_TYPES = ("application/json", "text/")
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    
+    @staticmethod
+    def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+        accepted = {}
+        for part in accept_encoding.split(","):
+            token, _, params = part.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            if token:
+                accepted[token.strip().lower()] = quality
+        
+        candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+        wildcard = accepted.get("*", 0.0)
+        scored = [(accepted.get(encoding, wildcard), encoding) for encoding in candidates]
+        scored = [item for item in scored if item[0] > 0]
+        if not scored:
+            return None
+        return max(scored, key=lambda item: item[0])[1]
+    
+    @classmethod
+    def compress(cls, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=cls.BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=cls.GZIP_LEVEL)
+    
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        
+        content_type = response.headers.get("content-type", "")
+        if "content-encoding" in response.headers or not content_type.startswith(self.COMPRESSIBLE_TYPES):
+            return response
+        
+        vary = response.headers.get("vary")
+        response.headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        
+        encoding = self.negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return response
+        
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        
+        if len(body) < settings.COMPRESSION_MIN_BYTES:
+            return Response(content=body, status_code=response.status_code, headers=headers)
+        
+        headers["content-encoding"] = encoding
+        return Response(
+            content=self.compress(body, encoding),
+            status_code=response.status_code,
+            headers=headers
+        )
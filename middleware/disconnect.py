@@ -0,0 +1,57 @@
+import asyncio
+from typing import Awaitable, Callable
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class DisconnectMiddleware:
+    """Watches the server's ``receive`` channel for ``http.disconnect`` while a request runs.
+    
+    ``BaseHTTPMiddleware`` layers hide the disconnect from ``Request.is_disconnected``, so this
+    pure ASGI middleware must be registered outermost. The event is stored in the request state.
+    """
+    
+    STATE_KEY = "client_disconnected"
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        disconnected = asyncio.Event()
+        messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        
+        async def pump() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+        
+        async def receive_message() -> Message:
+            if disconnected.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+        
+        scope.setdefault("state", {})[self.STATE_KEY] = disconnected
+        pump_task = asyncio.create_task(pump())
+        try:
+            await self.app(scope, receive_message, send)
+        finally:
+            pump_task.cancel()
+
+
+def client_disconnected(request: Request) -> Callable[[], Awaitable[bool]]:
+    """Disconnect probe for ``JobContext``, falling back to ``request.is_disconnected``."""
+    disconnected = request.scope.get("state", {}).get(DisconnectMiddleware.STATE_KEY)
+    if disconnected is None:
+        return request.is_disconnected
+    
+    async def is_disconnected() -> bool:
+        return disconnected.is_set()
+    
+    return is_disconnected
@@ -4,7 +4,22 @@ from .schemas import (
     ExtractedLocationsResponse,
     ExtractedAddressesResponse,
     LocationResult,
+    TokenUsage,
+    ImagePlan,
+    TierAttempt,
+    ModelTierStats,
+    PageUsage,
+    JobUsage,
+    PageOutcome,
+    ExtractionMetadata,
+    ExtractionResult,
     ProcessPDFResponse,
+    CompactLocationColumns,
+    CompactProcessPDFResponse,
+    RenderCostEstimate,
+    AdmissionStatsResponse,
+    JobSubmissionResponse,
+    JobStatusResponse,
     HealthResponse,
     ErrorResponse
 )
@@ -15,7 +30,22 @@ __all__ = [
     "ExtractedLocationsResponse",
     "ExtractedAddressesResponse",
     "LocationResult",
+    "TokenUsage",
+    "ImagePlan",
+    "TierAttempt",
+    "ModelTierStats",
+    "PageUsage",
+    "JobUsage",
+    "PageOutcome",
+    "ExtractionMetadata",
+    "ExtractionResult",
     "ProcessPDFResponse",
+    "CompactLocationColumns",
+    "CompactProcessPDFResponse",
+    "RenderCostEstimate",
+    "AdmissionStatsResponse",
+    "JobSubmissionResponse",
+    "JobStatusResponse",
     "HealthResponse",
     "ErrorResponse"
 ]
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -28,13 +28,163 @@ class LocationResult(BaseModel):
     maps_url: str
 
 
-class ProcessPDFResponse(BaseModel):
+class TokenUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+
+
+class ImagePlan(BaseModel):
+    detail: Literal["low", "high"]
+    width: int
+    height: int
+    estimated_tokens: int
+
+
+class TierAttempt(BaseModel):
+    tier: int
+    model: str
+    latency_seconds: float
+    accepted: bool
+    issues: List[str] = []
+
+
+class ModelTierStats(BaseModel):
+    tier: int
+    model: str
+    attempts: int = 0
+    accepted: int = 0
+    escalated: int = 0
+    hit_rate: float = 0.0
+    avg_latency_seconds: float = 0.0
+    total_latency_seconds: float = 0.0
+
+
+class PageUsage(TokenUsage):
+    page: int
+    document: Literal["map", "routing"]
+    model: Optional[str] = None
+    attempts: List[TierAttempt] = []
+    detail: str
+    image_width: int
+    image_height: int
+    estimated_image_tokens: int
+
+
+class JobUsage(TokenUsage):
+    token_budget: Optional[int] = None
+    estimated_image_tokens: int = 0
+    pages: List[PageUsage] = []
+
+
+class PageOutcome(BaseModel):
+    document: Literal["map", "routing"]
+    page: int
+    data: Optional[Dict[str, Any]] = None
+    source: Optional[Literal["vision", "cache", "text_layer"]] = None
+    usage: Optional[PageUsage] = None
+    skipped: bool = False
+
+
+class ExtractionMetadata(BaseModel):
+    """Job-level fields shared by the internal extraction result and both response layouts."""
+    partial: bool = Field(False, description="True when the job stopped early and results are incomplete")
+    partial_reason: Optional[str] = None
+    pages_processed: int = 0
+    pages_total: int = 0
+    skipped_pages: List[int] = Field(default_factory=list, description="Map pages not extracted")
+    skipped_routing_pages: List[int] = Field(default_factory=list, description="Routing pages not extracted")
+    reused_pages: List[int] = Field(
+        default_factory=list,
+        description="Map pages whose content was unchanged since a previous upload and were not re-extracted"
+    )
+    reused_routing_pages: List[int] = Field(
+        default_factory=list,
+        description="Routing pages whose content was unchanged since a previous upload and were not re-extracted"
+    )
+    text_layer_pages: List[int] = Field(
+        default_factory=list,
+        description="Map pages read from the PDF text layer without calling the vision model"
+    )
+    usage: Optional[JobUsage] = Field(None, description="OpenAI token usage per page and for the whole job")
+    model_tiers: List[ModelTierStats] = Field(
+        default_factory=list,
+        description="Per-tier hit rates and latencies of the model cascade"
+    )
+
+
+class ExtractionResult(ExtractionMetadata):
+    locations: List[LocationResult]
+
+
+class ProcessPDFResponse(ExtractionMetadata):
     success: bool
     message: str
     locations: List[LocationResult]
     total_locations: int = Field(description="Total number of locations extracted")
 
 
+class CompactLocationColumns(BaseModel):
+    page: List[int]
+    location_name: List[str]
+    address_index: List[Optional[int]] = Field(description="Index into `addresses`, null when no address matched")
+    linear_feet: List[Optional[float]]
+    maps_query: List[Optional[str]] = Field(
+        description="Explicit maps query, null when it is the matched address or, failing that, the location name"
+    )
+
+
+class CompactProcessPDFResponse(ExtractionMetadata):
+    format: Literal["compact"] = "compact"
+    success: bool
+    message: str
+    total_locations: int
+    maps_url_prefix: str = Field(description="maps_url = maps_url_prefix + URL-encoded maps query")
+    addresses: List[str] = Field(description="Distinct matched addresses referenced by `address_index`")
+    columns: CompactLocationColumns
+
+
+class RenderCostEstimate(BaseModel):
+    pages: int
+    total_pixels: int
+    peak_pixels: int
+    estimated_bytes: int = Field(description="Peak memory expected while rendering, including the PDF itself")
+
+
+class AdmissionStatsResponse(BaseModel):
+    capacity_bytes: int
+    in_flight_bytes: int
+    active_jobs: int
+    queue_depth: int
+    max_queue_depth: int
+    total_admitted: int
+    total_rejected: int
+    last_wait_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+
+
+class JobSubmissionResponse(BaseModel):
+    job_id: str
+    status: str
+    pages_total: int = Field(description="Page tasks queued for workers")
+    status_url: str
+    result_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "finalizing", "completed", "failed"]
+    pages_total: int
+    pages_done: int
+    pages_failed: int = Field(description="Pages that exhausted their retries")
+    pages_pending: int = Field(description="Pages waiting for or leased by a worker")
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
 class HealthResponse(BaseModel):
     status: str
     environment: str
@@ -1,3 +1,5 @@
 from .location_repository import LocationRepository
+from .page_result_repository import PageResultRepository
+from .job_repository import JobRepository
 
-__all__ = ["LocationRepository"]
+__all__ = ["LocationRepository", "PageResultRepository", "JobRepository"]
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class JobRepository:
+    """Durable job and page-task queue in a local SQLite database shared by the API and workers.
+    
+    WAL mode needs shared memory, so every process using the database must run on the same host.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        params TEXT NOT NULL,
+        pages_total INTEGER NOT NULL,
+        lease_until REAL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS job_files (
+        job_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (job_id, name)
+    );
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        page_index INTEGER NOT NULL,
+        phase INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker_id TEXT,
+        lease_until REAL,
+        result TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, phase, id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks (job_id, status);
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def create_job(
+        self,
+        job_id: str,
+        params: Dict[str, Any],
+        files: Dict[str, bytes],
+        tasks: List[Dict[str, Any]]
+    ) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, pages_total, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(params), len(tasks), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_files (job_id, name, data) VALUES (?, ?, ?)",
+                [(job_id, name, sqlite3.Binary(data)) for name, data in files.items()]
+            )
+            conn.executemany(
+                "INSERT INTO tasks (job_id, kind, page_index, phase, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                [(job_id, task["kind"], task["page_index"], task["phase"], now) for task in tasks]
+            )
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["params"] = json.loads(job["params"])
+            job["task_counts"] = {
+                status: count for status, count in conn.execute(
+                    "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)
+                )
+            }
+            return job
+    
+    def get_file(self, job_id: str, name: str) -> Optional[bytes]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM job_files WHERE job_id = ? AND name = ?", (job_id, name)
+            ).fetchone()
+            return bytes(row["data"]) if row else None
+    
+    def lease_task(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', error = 'lease expired after final attempt', updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, max_attempts)
+            )
+            row = conn.execute(
+                """
+                SELECT t.* FROM tasks t JOIN jobs j ON j.id = t.job_id
+                WHERE (t.status = 'pending' OR (t.status = 'leased' AND t.lease_until < ?))
+                  AND (t.phase = 0 OR NOT EXISTS (
+                      SELECT 1 FROM tasks r
+                      WHERE r.job_id = t.job_id AND r.phase < t.phase AND r.status IN ('pending', 'leased')
+                  ))
+                ORDER BY j.created_at, t.phase, t.id
+                LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, worker_id = ?, "
+                "lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (now, row["job_id"])
+            )
+            task = dict(row)
+            task["attempts"] += 1
+            return task
+    
+    def renew_lease(self, task_id: int, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (now + lease_seconds, now, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def complete_task(self, task_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (json.dumps(result), now, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def fail_task(self, task_id: int, worker_id: str, error: str, max_attempts: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (max_attempts, error, now, task_id, worker_id)
+            )
+    
+    def task_results(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, page_index, status, result, error FROM tasks WHERE job_id = ? ORDER BY phase, page_index",
+                (job_id,)
+            ).fetchall()
+        return [
+            {**dict(row), "result": json.loads(row["result"]) if row["result"] else None}
+            for row in rows
+        ]
+    
+    def claim_finalizable_job(self, lease_seconds: float, job_id: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT j.id FROM jobs j
+                WHERE (j.status IN ('queued', 'running') OR (j.status = 'finalizing' AND j.lease_until < ?))
+                  AND (? IS NULL OR j.id = ?)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM tasks t WHERE t.job_id = j.id AND t.status IN ('pending', 'leased')
+                  )
+                ORDER BY j.created_at
+                LIMIT 1
+                """,
+                (now, job_id, job_id)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'finalizing', lease_until = ?, updated_at = ? WHERE id = ?",
+                (now + lease_seconds, now, row["id"])
+            )
+            return row["id"]
+    
+    def finish_job(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, job_id)
+            )
+            conn.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
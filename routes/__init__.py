@@ -1,4 +1,5 @@
 from .location_routes import router as location_router
+from .job_routes import router as job_router
 from .health_routes import router as health_router
 
-__all__ = ["location_router", "health_router"]
+__all__ = ["location_router", "job_router", "health_router"]
@@ -0,0 +1,80 @@
+from typing import Literal, Optional, Union
+from fastapi import APIRouter, UploadFile, File, Form, Query, Security, status
+from fastapi.security import APIKeyHeader
+from models.schemas import (
+    JobSubmissionResponse,
+    JobStatusResponse,
+    ProcessPDFResponse,
+    CompactProcessPDFResponse
+)
+from controllers.job_controller import JobController
+from utils.responses import ModelJSONResponse
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+controller = JobController()
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+@router.post(
+    "",
+    response_model=JobSubmissionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue an extraction job",
+    description="""
+    Queue PDFs for extraction by the worker pool and return immediately with a job id.
+    Takes the same `map_pdf`, `routing_pdf`, `zoom`, `max_pages` and `token_budget` fields as
+    `/api/v1/locations/extract`.
+    
+    Each page becomes a task in a durable local queue. Workers (`python worker.py`) lease tasks,
+    and a task whose worker crashes is retried once its lease expires. Poll `status_url`, then
+    fetch `result_url` once the job is `completed`.
+    """
+)
+async def submit_job(
+    map_pdf: UploadFile = File(..., description="Map PDF file with locations to extract"),
+    routing_pdf: Optional[UploadFile] = File(None, description="Optional routing PDF with addresses"),
+    zoom: float = Form(4.0, ge=2.0, le=6.0, description="Upper bound on the render scale; pages are capped at the vision model's image size"),
+    max_pages: int = Form(30, ge=1, le=200, description="Maximum pages to process"),
+    token_budget: Optional[int] = Form(None, ge=1, description="OpenAI token budget for the whole job"),
+    api_key: str = Security(api_key_header)
+) -> JobSubmissionResponse:
+    return await controller.submit_job(
+        map_pdf=map_pdf,
+        routing_pdf=routing_pdf,
+        zoom=zoom,
+        max_pages=max_pages,
+        token_budget=token_budget
+    )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Extraction job status",
+    description="Job state and page task progress"
+)
+async def get_job_status(
+    job_id: str,
+    api_key: str = Security(api_key_header)
+) -> JobStatusResponse:
+    return await controller.get_job_status(job_id)
+
+
+@router.get(
+    "/{job_id}/result",
+    response_model=Union[ProcessPDFResponse, CompactProcessPDFResponse],
+    summary="Extraction job result",
+    description="""
+    Result of a completed job, in the same layout as `/api/v1/locations/extract`.
+    Returns **409** while the job is still queued or running. Pages that failed on every
+    attempt are listed as skipped and the result is flagged as `partial`.
+    """
+)
+async def get_job_result(
+    job_id: str,
+    result_format: Literal["full", "compact"] = Query("full", description="Response layout"),
+    api_key: str = Security(api_key_header)
+) -> ModelJSONResponse:
+    response = await controller.get_job_result(job_id, result_format)
+    return ModelJSONResponse(response)
@@ -1,8 +1,10 @@
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Form, Query, Security
+from typing import Literal, Optional, Union
+from fastapi import APIRouter, Request, UploadFile, File, Form, Query, Security
 from fastapi.security import APIKeyHeader
-from models.schemas import ProcessPDFResponse
+from models.schemas import ProcessPDFResponse, CompactProcessPDFResponse, AdmissionStatsResponse
 from controllers.location_controller import LocationController
+from utils.responses import ModelJSONResponse
+from middleware.disconnect import client_disconnected
 
 router = APIRouter(prefix="/api/v1/locations", tags=["Locations"])
 controller = LocationController()
@@ -12,30 +14,64 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 @router.post(
     "/extract",
-    response_model=ProcessPDFResponse,
+    response_model=Union[ProcessPDFResponse, CompactProcessPDFResponse],
     summary="Extract locations from PDF maps",
     description="""
     Upload PDF files to extract location information:
     - **map_pdf**: Required PDF containing map with location markers
     - **routing_pdf**: Optional PDF containing routing information with addresses
-    - **zoom**: Render zoom level (2.0-6.0, default: 4.0) - higher = clearer text
+    - **zoom**: Upper bound on the render scale (2.0-6.0, default: 4.0). Pages are rendered at the size
+      the vision model reads (short side at most 768 px in high detail), so zoom only matters for small pages
     - **max_pages**: Maximum pages to process (1-200, default: 30)
+    - **deadline_seconds**: Optional time budget for the whole job, split across the remaining pages.
+      When it runs out, processing stops and the response is flagged as `partial`.
+    - **token_budget**: Optional OpenAI token budget for the whole job. Image detail and resolution
+      are chosen per page to fit it; actual usage is returned per page and per job in `usage`
+    - **result_format**: `full` (default) or `compact` - a columnar response with deduplicated
+      addresses where `maps_url` is derived client-side from `maps_url_prefix`
+    
+    Processing is cancelled if the client disconnects. Responses are gzip/brotli compressed
+    when requested via `Accept-Encoding`.
     
     Returns location names, addresses, linear feet measurements, and Google Maps links.
     
+    Jobs are admitted against a global rendering-memory budget. When the server is at capacity
+    the request waits in a bounded queue, or is rejected with **429** and a `Retry-After` header.
+    
     **Note**: In development mode (ENVIRONMENT=development), returns hardcoded data to save costs.
     """
 )
 async def extract_locations(
+    request: Request,
     map_pdf: UploadFile = File(..., description="Map PDF file with locations to extract"),
     routing_pdf: Optional[UploadFile] = File(None, description="Optional routing PDF with addresses"),
-    zoom: float = Form(4.0, ge=2.0, le=6.0, description="Render zoom level"),
+    zoom: float = Form(4.0, ge=2.0, le=6.0, description="Upper bound on the render scale; pages are capped at the vision model's image size"),
     max_pages: int = Form(30, ge=1, le=200, description="Maximum pages to process"),
+    deadline_seconds: Optional[float] = Form(None, gt=0, le=3600, description="Time budget for the whole job in seconds"),
+    result_format: Literal["full", "compact"] = Form("full", description="Response layout"),
+    token_budget: Optional[int] = Form(None, ge=1, description="OpenAI token budget for the whole job"),
     api_key: str = Security(api_key_header)
-) -> ProcessPDFResponse:
-    return await controller.process_location_pdfs(
+) -> ModelJSONResponse:
+    response = await controller.process_location_pdfs(
         map_pdf=map_pdf,
         routing_pdf=routing_pdf,
         zoom=zoom,
-        max_pages=max_pages
+        max_pages=max_pages,
+        deadline_seconds=deadline_seconds,
+        is_disconnected=client_disconnected(request),
+        result_format=result_format,
+        token_budget=token_budget
     )
+    return ModelJSONResponse(response)
+
+
+@router.get(
+    "/admission",
+    response_model=AdmissionStatsResponse,
+    summary="Extraction admission statistics",
+    description="Current rendering-memory budget usage, admission queue depth and queue wait times"
+)
+async def admission_stats(
+    api_key: str = Security(api_key_header)
+) -> AdmissionStatsResponse:
+    return controller.get_admission_stats()
@@ -1,5 +1,17 @@
 from .pdf_service import PDFService
 from .openai_service import OpenAIService
+from .token_planner import TokenPlanner
+from .text_layer_service import TextLayerService
+from .admission_service import AdmissionService
 from .location_service import LocationService
+from .job_service import JobService
 
-__all__ = ["PDFService", "OpenAIService", "LocationService"]
+__all__ = [
+    "PDFService",
+    "OpenAIService",
+    "TokenPlanner",
+    "TextLayerService",
+    "AdmissionService",
+    "LocationService",
+    "JobService"
+]
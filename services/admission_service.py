@@ -0,0 +1,154 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+from models.schemas import AdmissionStatsResponse
+from config.settings import get_settings
+from utils.logger import logger
+from utils.job_context import JobContext, DeadlineExceededError
+
+settings = get_settings()
+
+
+class AdmissionRejectedError(Exception):
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionService:
+    """FIFO admission of extraction jobs against a global budget of rendering memory."""
+    
+    def __init__(
+        self,
+        capacity_bytes: int = settings.ADMISSION_MAX_BYTES,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+        retry_after: int = settings.ADMISSION_RETRY_AFTER_SECONDS
+    ):
+        self.capacity_bytes = capacity_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        
+        self._in_flight_bytes = 0
+        self._active_jobs = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        
+        self._total_admitted = 0
+        self._total_rejected = 0
+        self._total_wait = 0.0
+        self._last_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_job_seconds: Optional[float] = None
+    
+    def _fits(self, cost: int) -> bool:
+        return self._active_jobs == 0 or self._in_flight_bytes + cost <= self.capacity_bytes
+    
+    def _grant(self, cost: int) -> None:
+        self._in_flight_bytes += cost
+        self._active_jobs += 1
+    
+    def _release(self, cost: int) -> None:
+        self._in_flight_bytes -= cost
+        self._active_jobs -= 1
+        
+        while self._waiters:
+            waiter_cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(waiter_cost):
+                break
+            self._waiters.popleft()
+            self._grant(waiter_cost)
+            future.set_result(None)
+    
+    def _retry_after_seconds(self) -> int:
+        if self._avg_job_seconds is None:
+            return self.retry_after
+        estimate = self._avg_job_seconds * (len(self._waiters) + 1) / max(self._active_jobs, 1)
+        return min(max(math.ceil(estimate), 1), 600)
+    
+    def _reject(self, reason: str) -> AdmissionRejectedError:
+        self._total_rejected += 1
+        retry_after = self._retry_after_seconds()
+        logger.warning(f"Admission rejected: {reason} (retry after {retry_after}s)")
+        return AdmissionRejectedError(reason, retry_after)
+    
+    def _record_wait(self, waited: float) -> None:
+        self._total_admitted += 1
+        self._total_wait += waited
+        self._last_wait = waited
+        self._max_wait = max(self._max_wait, waited)
+    
+    def _record_job(self, duration: float) -> None:
+        if self._avg_job_seconds is None:
+            self._avg_job_seconds = duration
+        else:
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * duration
+    
+    async def _acquire(self, cost: int, context: JobContext) -> float:
+        started = time.monotonic()
+        
+        if not self._waiters and self._fits(cost):
+            self._grant(cost)
+            return 0.0
+        
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(f"Admission queue full ({self.max_queue} jobs waiting)")
+        
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((cost, future))
+        logger.info(
+            f"Job queued for admission - cost: {cost} bytes, "
+            f"in flight: {self._in_flight_bytes}/{self.capacity_bytes}, queue depth: {len(self._waiters)}"
+        )
+        
+        try:
+            await context.wait(asyncio.shield(future), timeout=self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._release(cost)
+            else:
+                future.cancel()
+                try:
+                    self._waiters.remove((cost, future))
+                except ValueError:
+                    pass
+            if isinstance(e, DeadlineExceededError):
+                raise self._reject(f"No capacity within {time.monotonic() - started:.1f}s")
+            raise
+        
+        return time.monotonic() - started
+    
+    @asynccontextmanager
+    async def admit(self, estimated_bytes: int, context: JobContext) -> AsyncIterator[float]:
+        cost = min(estimated_bytes, self.capacity_bytes)
+        waited = await self._acquire(cost, context)
+        self._record_wait(waited)
+        logger.info(f"Job admitted after {waited:.2f}s - cost: {cost} bytes")
+        
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self._record_job(time.monotonic() - started)
+            self._release(cost)
+    
+    def stats(self) -> AdmissionStatsResponse:
+        return AdmissionStatsResponse(
+            capacity_bytes=self.capacity_bytes,
+            in_flight_bytes=self._in_flight_bytes,
+            active_jobs=self._active_jobs,
+            queue_depth=len(self._waiters),
+            max_queue_depth=self.max_queue,
+            total_admitted=self._total_admitted,
+            total_rejected=self._total_rejected,
+            last_wait_seconds=round(self._last_wait, 3),
+            avg_wait_seconds=round(self._total_wait / self._total_admitted, 3) if self._total_admitted else 0.0,
+            max_wait_seconds=round(self._max_wait, 3)
+        )
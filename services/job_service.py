@@ -0,0 +1,211 @@
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+import pypdfium2 as pdfium
+from starlette.concurrency import run_in_threadpool
+from models.schemas import PageOutcome, ExtractionResult, JobStatusResponse
+from repositories.job_repository import JobRepository
+from services.location_service import LocationService
+from services.token_planner import TokenBudget
+from config.settings import get_settings
+from utils.logger import logger
+from utils.job_context import JobContext
+
+settings = get_settings()
+
+
+class JobService:
+    """Queues extraction jobs as page tasks and processes them from worker processes."""
+    
+    DOCUMENTS = {"addresses": "routing", "locations": "map"}
+    
+    def __init__(self):
+        self.repository = JobRepository(settings.JOBS_DB_PATH)
+        self.location_service = LocationService()
+        self.pdf_service = self.location_service.pdf_service
+        self._document: Optional[Tuple[str, str, pdfium.PdfDocument]] = None
+    
+    async def submit(
+        self,
+        map_pdf_bytes: bytes,
+        routing_pdf_bytes: Optional[bytes] = None,
+        zoom: float = 4.0,
+        max_pages: int = 30,
+        token_budget: Optional[int] = None
+    ) -> JobStatusResponse:
+        job_id = uuid.uuid4().hex
+        files = {"map": map_pdf_bytes}
+        if routing_pdf_bytes:
+            files["routing"] = routing_pdf_bytes
+        
+        tasks: List[Dict[str, Any]] = []
+        if settings.ENVIRONMENT != "development":
+            for phase, kind in enumerate(("addresses", "locations")):
+                pdf_bytes = files.get(self.DOCUMENTS[kind])
+                if not pdf_bytes:
+                    continue
+                pages = min(await run_in_threadpool(self._count_pages, pdf_bytes), max_pages)
+                tasks.extend({"kind": kind, "page_index": index, "phase": phase} for index in range(pages))
+        
+        params = {
+            "zoom": zoom,
+            "max_pages": max_pages,
+            "token_budget": token_budget or settings.TOKEN_BUDGET_PER_JOB
+        }
+        await run_in_threadpool(self.repository.create_job, job_id, params, files, tasks)
+        logger.info(f"Queued job {job_id} with {len(tasks)} page tasks")
+        return await self.get_status(job_id)
+    
+    def _count_pages(self, pdf_bytes: bytes) -> int:
+        try:
+            pdf = self.pdf_service.open_document(pdf_bytes)
+        except pdfium.PdfiumError as e:
+            raise ValueError(f"Invalid PDF: {str(e)}")
+        try:
+            return self.pdf_service.page_count(pdf)
+        finally:
+            self.pdf_service.close_document(pdf)
+    
+    async def get_status(self, job_id: str) -> Optional[JobStatusResponse]:
+        job = await run_in_threadpool(self.repository.get_job, job_id)
+        if job is None:
+            return None
+        counts = job["task_counts"]
+        return JobStatusResponse(
+            job_id=job["id"],
+            status=job["status"],
+            pages_total=job["pages_total"],
+            pages_done=counts.get("done", 0),
+            pages_failed=counts.get("failed", 0),
+            pages_pending=counts.get("pending", 0) + counts.get("leased", 0),
+            error=job["error"],
+            created_at=job["created_at"],
+            updated_at=job["updated_at"]
+        )
+    
+    async def get_result(self, job_id: str) -> Optional[ExtractionResult]:
+        job = await run_in_threadpool(self.repository.get_job, job_id)
+        if job is None or job["result"] is None:
+            return None
+        return ExtractionResult.model_validate_json(job["result"])
+    
+    async def process_next(self, worker_id: str) -> bool:
+        """Run one page task, or finalize one finished job. Returns False when the queue is idle."""
+        task = await run_in_threadpool(
+            self.repository.lease_task, worker_id, settings.JOB_LEASE_SECONDS, settings.JOB_MAX_ATTEMPTS
+        )
+        if task is not None:
+            await self._run_task(task, worker_id)
+            return True
+        
+        job_id = await run_in_threadpool(self.repository.claim_finalizable_job, settings.JOB_LEASE_SECONDS)
+        if job_id is not None:
+            await self._finalize(job_id)
+            return True
+        
+        self._close_document()
+        return False
+    
+    async def _run_task(self, task: Dict[str, Any], worker_id: str) -> None:
+        job_id, kind, index = task["job_id"], task["kind"], task["page_index"]
+        label = f"job {job_id} {self.DOCUMENTS[kind]} page {index + 1} (attempt {task['attempts']})"
+        logger.info(f"Worker {worker_id} processing {label}")
+        
+        try:
+            job = await run_in_threadpool(self.repository.get_job, job_id)
+            params = job["params"]
+            pdf = await self._open_document(job_id, self.DOCUMENTS[kind])
+            
+            address_dict: Dict[str, str] = {}
+            if kind == "locations":
+                for routing in await run_in_threadpool(self.repository.task_results, job_id):
+                    if routing["kind"] == "addresses" and routing["result"]:
+                        address_dict.update(self.location_service.addresses_from_data(routing["result"]["data"]))
+            
+            token_budget = params["token_budget"]
+            budget = TokenBudget(token_budget // max(job["pages_total"], 1) if token_budget else None)
+            
+            async with JobContext(
+                deadline_seconds=settings.JOB_TASK_TIMEOUT_SECONDS,
+                min_page_seconds=settings.MIN_PAGE_BUDGET_SECONDS
+            ) as context:
+                heartbeat = asyncio.create_task(self._renew_lease(task["id"], worker_id, context))
+                try:
+                    data, source, page_usage = await self.location_service.extract_page(
+                        pdf, index, params["zoom"], kind, context, budget,
+                        pages_left=1, address_dict=address_dict
+                    )
+                finally:
+                    heartbeat.cancel()
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed {label}: {str(e)}", exc_info=True)
+            await run_in_threadpool(
+                self.repository.fail_task, task["id"], worker_id, str(e), settings.JOB_MAX_ATTEMPTS
+            )
+            return
+        
+        outcome = PageOutcome(
+            document=self.DOCUMENTS[kind], page=index + 1, data=data, source=source, usage=page_usage
+        )
+        completed = await run_in_threadpool(
+            self.repository.complete_task, task["id"], worker_id, outcome.model_dump(mode="json")
+        )
+        if not completed:
+            logger.warning(f"Worker {worker_id} lost the lease on {label}; result discarded")
+    
+    async def _renew_lease(self, task_id: int, worker_id: str, context: JobContext) -> None:
+        """Keep a task leased while it runs, and cancel it if another worker has taken it over."""
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            renewed = await run_in_threadpool(
+                self.repository.renew_lease, task_id, worker_id, settings.JOB_LEASE_SECONDS
+            )
+            if not renewed:
+                logger.warning(f"Worker {worker_id} lost the lease on task {task_id} - cancelling it")
+                context.cancel()
+                return
+    
+    async def _finalize(self, job_id: str) -> None:
+        logger.info(f"Finalizing job {job_id}")
+        try:
+            job = await run_in_threadpool(self.repository.get_job, job_id)
+            if settings.ENVIRONMENT == "development":
+                result = await self.location_service.process_pdfs(map_pdf_bytes=b"")
+            else:
+                outcomes = []
+                for task in await run_in_threadpool(self.repository.task_results, job_id):
+                    if task["status"] == "done":
+                        outcomes.append(PageOutcome.model_validate(task["result"]))
+                    else:
+                        outcomes.append(PageOutcome(
+                            document=self.DOCUMENTS[task["kind"]], page=task["page_index"] + 1, skipped=True
+                        ))
+                result = self.location_service.assemble_result(
+                    outcomes, job["pages_total"], job["params"]["token_budget"], skip_reason="Some pages failed"
+                )
+        except Exception as e:
+            logger.error(f"Failed to finalize job {job_id}: {str(e)}", exc_info=True)
+            await run_in_threadpool(self.repository.finish_job, job_id, "failed", error=str(e))
+            return
+        
+        await run_in_threadpool(
+            self.repository.finish_job, job_id, "completed", result.model_dump(mode="json")
+        )
+        logger.info(f"Job {job_id} completed with {len(result.locations)} locations")
+    
+    async def _open_document(self, job_id: str, name: str) -> pdfium.PdfDocument:
+        if self._document and self._document[:2] == (job_id, name):
+            return self._document[2]
+        
+        self._close_document()
+        pdf_bytes = await run_in_threadpool(self.repository.get_file, job_id, name)
+        if pdf_bytes is None:
+            raise ValueError(f"Job {job_id} has no {name} PDF")
+        pdf = await run_in_threadpool(self.pdf_service.open_document, pdf_bytes)
+        self._document = (job_id, name, pdf)
+        return pdf
+    
+    def _close_document(self) -> None:
+        if self._document:
+            self.pdf_service.close_document(self._document[2])
+            self._document = None
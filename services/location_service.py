@@ -1,27 +1,52 @@
 import re
+import time
 import urllib.parse
-from typing import List, Dict, Optional
-from models.schemas import LocationResult
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+import pypdfium2 as pdfium
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from models.schemas import (
+    LocationResult,
+    ExtractedLocationsResponse,
+    ExtractedAddressesResponse,
+    ExtractionResult,
+    CompactLocationColumns,
+    ModelTierStats,
+    PageUsage,
+    JobUsage,
+    PageOutcome
+)
 from repositories.location_repository import LocationRepository
+from repositories.page_result_repository import PageResultRepository
 from services.pdf_service import PDFService
-from services.openai_service import OpenAIService
+from services.openai_service import OpenAIService, CascadeProgress
+from services.token_planner import TokenPlanner, TokenBudget
+from services.text_layer_service import TextLayerService
 from config.settings import get_settings
 from utils.logger import logger
+from utils.job_context import JobContext, JobCancelledError, DeadlineExceededError
 
 settings = get_settings()
 
 
 class LocationService:
     
+    MAPS_SEARCH_URL = "https://www.google.com/maps/search/?api=1&query="
+    CASCADE_GRACE_SECONDS = 1.0
+    
     def __init__(self):
         self.repository = LocationRepository()
+        self.page_results = PageResultRepository(settings.PAGE_CACHE_MAX_ENTRIES)
         self.pdf_service = PDFService()
         self.openai_service = OpenAIService()
+        self.planner = TokenPlanner(settings.model_cascade[0], settings.VISION_DETAIL)
+        self.text_layer_service = TextLayerService(settings.TEXT_LAYER_MAX_LABEL_DISTANCE)
     
     @staticmethod
     def google_maps_url(query: str) -> str:
-        q = urllib.parse.quote(query or "")
-        return f"https://www.google.com/maps/search/?api=1&query={q}"
+        return LocationService.MAPS_SEARCH_URL + urllib.parse.quote(query or "")
     
     @staticmethod
     def normalize_location_name(name: str) -> str:
@@ -59,22 +84,83 @@ class LocationService:
         
         return None
     
+    @staticmethod
+    def is_garbled_name(name: str) -> bool:
+        name = name.strip()
+        letters = sum(c.isalpha() for c in name)
+        visible = sum(not c.isspace() for c in name)
+        return (
+            letters < 3
+            or "\ufffd" in name
+            or letters / max(visible, 1) < 0.6
+            or re.search(r"(.)\1{3,}", name) is not None
+        )
+    
+    def location_issues(self, data: Dict[str, Any], address_dict: Dict[str, str]) -> List[str]:
+        try:
+            parsed = ExtractedLocationsResponse.model_validate(data)
+        except ValidationError as e:
+            return [f"schema: {e.error_count()} validation errors"]
+        
+        issues = []
+        seen = set()
+        for item in parsed.items:
+            name = item.location_name
+            normalized = self.normalize_location_name(name)
+            if self.is_garbled_name(name):
+                issues.append(f"garbled name {name!r}")
+            if normalized in seen:
+                issues.append(f"duplicate name {name!r}")
+            seen.add(normalized)
+            if item.linear_feet is not None and not 0 < item.linear_feet <= settings.MAX_LINEAR_FEET:
+                issues.append(f"implausible linear_feet {item.linear_feet} for {name!r}")
+            if address_dict and not self.find_best_address_match(name, address_dict):
+                issues.append(f"no routing match for {name!r}")
+        return issues
+    
+    def address_issues(self, data: Dict[str, Any]) -> List[str]:
+        try:
+            parsed = ExtractedAddressesResponse.model_validate(data)
+        except ValidationError as e:
+            return [f"schema: {e.error_count()} validation errors"]
+        
+        issues = []
+        seen = set()
+        for item in parsed.items:
+            normalized = self.normalize_location_name(item.location_name)
+            if self.is_garbled_name(item.location_name):
+                issues.append(f"garbled name {item.location_name!r}")
+            if normalized in seen:
+                issues.append(f"duplicate name {item.location_name!r}")
+            seen.add(normalized)
+            if not re.search(r"\d", item.full_address) or self.is_garbled_name(item.full_address):
+                issues.append(f"implausible address {item.full_address!r}")
+        return issues
+    
     async def process_pdfs(
         self,
         map_pdf_bytes: bytes,
         routing_pdf_bytes: Optional[bytes] = None,
         zoom: float = 4.0,
-        max_pages: int = 30
-    ) -> List[LocationResult]:
+        max_pages: int = 30,
+        context: Optional[JobContext] = None,
+        token_budget: Optional[int] = None
+    ) -> ExtractionResult:
         logger.info(f"Processing PDFs - Environment: {settings.ENVIRONMENT}")
         
         if settings.ENVIRONMENT == "development":
             logger.info("Using development mode with hardcoded data")
-            return self._process_development_mode()
+            locations = self._process_development_mode()
+            return ExtractionResult(
+                locations=locations,
+                pages_processed=len(locations),
+                pages_total=len(locations)
+            )
         else:
             logger.info("Using production mode with OpenAI API")
             return await self._process_production_mode(
-                map_pdf_bytes, routing_pdf_bytes, zoom, max_pages
+                map_pdf_bytes, routing_pdf_bytes, zoom, max_pages,
+                context or JobContext(), token_budget or settings.TOKEN_BUDGET_PER_JOB
             )
     
     def _process_development_mode(self) -> List[LocationResult]:
@@ -109,55 +195,364 @@ class LocationService:
         logger.info(f"Processed {len(results)} locations in development mode")
         return results
     
+    @asynccontextmanager
+    async def _open_document(self, pdf_bytes: Optional[bytes]) -> AsyncIterator[Tuple[Optional[pdfium.PdfDocument], int]]:
+        if not pdf_bytes:
+            yield None, 0
+            return
+        
+        pdf = await run_in_threadpool(self.pdf_service.open_document, pdf_bytes)
+        try:
+            yield pdf, await run_in_threadpool(self.pdf_service.page_count, pdf)
+        finally:
+            await run_in_threadpool(self.pdf_service.close_document, pdf)
+    
+    async def _page_cache_key(
+        self,
+        pdf: pdfium.PdfDocument,
+        index: int,
+        zoom: float,
+        kind: str,
+        context: JobContext
+    ) -> Optional[Tuple[str, ...]]:
+        try:
+            fingerprint = await context.run(self.pdf_service.page_fingerprint, pdf, index)
+        except (JobCancelledError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            logger.warning(f"Could not fingerprint {kind} page {index + 1}: {str(e)}")
+            return None
+        return (kind, fingerprint, f"{zoom:g}", ",".join(settings.model_cascade))
+    
+    async def _extract_text_layer(
+        self,
+        pdf: pdfium.PdfDocument,
+        index: int,
+        context: JobContext
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            return await context.run(self.text_layer_service.extract_locations, pdf, index)
+        except (JobCancelledError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            logger.warning(f"Text layer extraction failed for page {index + 1}: {str(e)}")
+            return None
+    
+    async def extract_page(
+        self,
+        pdf: pdfium.PdfDocument,
+        index: int,
+        zoom: float,
+        kind: str,
+        context: JobContext,
+        budget: TokenBudget,
+        pages_left: int,
+        address_dict: Optional[Dict[str, str]] = None
+    ) -> Tuple[Dict[str, Any], str, Optional[PageUsage]]:
+        if kind == "addresses":
+            extractor = self.openai_service.extract_addresses_from_page
+            validator = self.address_issues
+        else:
+            extractor = self.openai_service.extract_locations_from_page
+            validator = partial(self.location_issues, address_dict=address_dict or {})
+        
+        timeout = context.page_timeout(pages_left)
+        started = time.monotonic()
+        
+        cache_key = await self._page_cache_key(pdf, index, zoom, kind, context)
+        if cache_key:
+            cached = self.page_results.get(cache_key)
+            if cached is not None:
+                logger.info(f"Reusing unchanged {kind} page {index + 1}")
+                return cached, "cache", None
+        
+        if kind == "locations" and settings.TEXT_LAYER_ENABLED:
+            local = await self._extract_text_layer(pdf, index, context)
+            issues = validator(local) if local is not None else []
+            if issues:
+                logger.info(f"Text layer of page {index + 1} failed validation, using vision: {'; '.join(issues[:3])}")
+            elif local is not None:
+                logger.info(f"Extracted {len(local['items'])} locations from text layer of page {index + 1}")
+                if cache_key:
+                    self.page_results.put(cache_key, local)
+                return local, "text_layer", None
+        
+        width, height = await context.run(self.pdf_service.page_size, pdf, index)
+        allowance = budget.allowance(pages_left)
+        if allowance is not None:
+            allowance -= self.openai_service.estimate_text_tokens(kind)
+        plan = self.planner.plan(width * zoom, height * zoom, allowance)
+        degraded = plan != self.planner.plan(width * zoom, height * zoom)
+        
+        img = await context.run(
+            self.pdf_service.render_page, pdf, index, plan.width / width, timeout=timeout
+        )
+        
+        if timeout is not None:
+            timeout = max(timeout - (time.monotonic() - started), 0.0)
+        progress = CascadeProgress()
+        try:
+            data, _, usage, attempts = await context.run(
+                partial(extractor, img, timeout=timeout, detail=plan.detail, validator=validator, progress=progress),
+                timeout=None if timeout is None else timeout + self.CASCADE_GRACE_SECONDS
+            )
+        except JobCancelledError:
+            progress.abandon()
+            raise
+        except DeadlineExceededError:
+            result = progress.abandon()
+            if result is None:
+                raise
+            logger.warning(f"Out of time escalating {kind} page {index + 1} - using best result so far")
+            data, _, usage, attempts = result
+        budget.spend(usage.total_tokens or plan.estimated_tokens)
+        
+        if cache_key and degraded:
+            logger.info(f"Not caching {kind} page {index + 1}: rendered below full resolution for the token budget")
+        elif cache_key and any(attempt.accepted and not attempt.issues for attempt in attempts):
+            self.page_results.put(cache_key, data)
+        elif cache_key:
+            logger.info(f"Not caching {kind} page {index + 1}: no tier passed validation")
+        
+        page_usage = PageUsage(
+            page=index + 1,
+            document="routing" if kind == "addresses" else "map",
+            detail=plan.detail,
+            image_width=img.width,
+            image_height=img.height,
+            estimated_image_tokens=plan.estimated_tokens,
+            model=next(attempt.model for attempt in attempts if attempt.accepted),
+            attempts=attempts,
+            **usage.model_dump()
+        )
+        return data, "vision", page_usage
+    
+    async def _extract_page_outcome(
+        self,
+        pdf: pdfium.PdfDocument,
+        index: int,
+        zoom: float,
+        kind: str,
+        context: JobContext,
+        budget: TokenBudget,
+        pages_left: int,
+        address_dict: Dict[str, str]
+    ) -> PageOutcome:
+        document = "routing" if kind == "addresses" else "map"
+        if context.expired:
+            return PageOutcome(document=document, page=index + 1, skipped=True)
+        
+        try:
+            data, source, page_usage = await self.extract_page(
+                pdf, index, zoom, kind, context, budget, pages_left, address_dict
+            )
+        except DeadlineExceededError as e:
+            logger.warning(f"Skipping {document} page {index + 1}: {str(e)}")
+            return PageOutcome(document=document, page=index + 1, skipped=True)
+        
+        return PageOutcome(document=document, page=index + 1, data=data, source=source, usage=page_usage)
+    
     async def _process_production_mode(
         self,
         map_pdf_bytes: bytes,
         routing_pdf_bytes: Optional[bytes],
         zoom: float,
-        max_pages: int
-    ) -> List[LocationResult]:
-        address_dict = {}
+        max_pages: int,
+        context: JobContext,
+        token_budget: Optional[int]
+    ) -> ExtractionResult:
+        outcomes: List[PageOutcome] = []
         
-        if routing_pdf_bytes:
-            logger.info("Processing routing PDF for addresses")
-            routing_pages = self.pdf_service.pdf_to_images(
-                routing_pdf_bytes, zoom, max_pages
-            )
+        async with self._open_document(routing_pdf_bytes) as (routing_pdf, routing_count), \
+                self._open_document(map_pdf_bytes) as (map_pdf, map_count):
+            routing_total = min(routing_count, max_pages)
+            map_total = min(map_count, max_pages)
+            pages_total = routing_total + map_total
+            budget = TokenBudget(token_budget)
             
-            for page_num, img in routing_pages:
-                data, _ = self.openai_service.extract_addresses_from_page(img)
-                for item in data.get("items", []):
-                    address_dict[item["location_name"]] = item["full_address"]
+            address_dict: Dict[str, str] = {}
+            if routing_pdf:
+                logger.info("Processing routing PDF for addresses")
+                for index in range(routing_total):
+                    outcome = await self._extract_page_outcome(
+                        routing_pdf, index, zoom, "addresses", context, budget,
+                        pages_left=pages_total - index, address_dict=address_dict
+                    )
+                    outcomes.append(outcome)
+                    address_dict.update(self.addresses_from_data(outcome.data))
+                
+                logger.info(f"Found {len(address_dict)} addresses in routing PDF")
             
-            logger.info(f"Found {len(address_dict)} addresses in routing PDF")
+            logger.info("Processing map PDF for locations")
+            for index in range(map_total):
+                outcomes.append(await self._extract_page_outcome(
+                    map_pdf, index, zoom, "locations", context, budget,
+                    pages_left=map_total - index, address_dict=address_dict
+                ))
         
-        logger.info("Processing map PDF for locations")
-        map_pages = self.pdf_service.pdf_to_images(map_pdf_bytes, zoom, max_pages)
+        return self.assemble_result(outcomes, pages_total, token_budget)
+    
+    @staticmethod
+    def addresses_from_data(data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not data:
+            return {}
+        return {item["location_name"]: item["full_address"] for item in data.get("items", [])}
+    
+    def assemble_result(
+        self,
+        outcomes: List[PageOutcome],
+        pages_total: int,
+        token_budget: Optional[int],
+        skip_reason: str = "Deadline reached"
+    ) -> ExtractionResult:
+        address_dict: Dict[str, str] = {}
+        for outcome in outcomes:
+            if outcome.document == "routing":
+                address_dict.update(self.addresses_from_data(outcome.data))
         
+        pages_processed = 0
+        skipped_routing_pages: List[int] = []
+        skipped_pages: List[int] = []
+        reused_routing_pages: List[int] = []
+        reused_pages: List[int] = []
+        text_layer_pages: List[int] = []
+        page_usages: List[PageUsage] = []
         results = []
-        for page_num, img in map_pages:
-            data, _ = self.openai_service.extract_locations_from_page(img)
+        
+        for outcome in outcomes:
+            is_map = outcome.document == "map"
+            if outcome.skipped:
+                (skipped_pages if is_map else skipped_routing_pages).append(outcome.page)
+                continue
             
-            for item in data.get("items", []):
-                location_name = item["location_name"]
-                
-                matched_address = None
-                if address_dict:
-                    matched_address = self.find_best_address_match(
-                        location_name, address_dict
-                    )
-                
-                query = matched_address if matched_address else location_name
-                
-                results.append(
-                    LocationResult(
-                        page=page_num,
-                        location_name=location_name,
-                        full_address=matched_address if matched_address else "Not found",
-                        linear_feet=item["linear_feet"],
-                        maps_url=self.google_maps_url(query),
-                    )
-                )
+            pages_processed += 1
+            if outcome.source == "cache":
+                (reused_pages if is_map else reused_routing_pages).append(outcome.page)
+            elif outcome.source == "text_layer":
+                text_layer_pages.append(outcome.page)
+            if outcome.usage:
+                page_usages.append(outcome.usage)
+            if is_map:
+                results.extend(self._build_location_results(outcome.page, outcome.data, address_dict))
+        
+        partial_reason = None
+        if skipped_pages or skipped_routing_pages:
+            partial_reason = (
+                f"{skip_reason} - extracted {pages_processed} of {pages_total} pages"
+            )
+            logger.warning(partial_reason)
         
+        if reused_pages or reused_routing_pages:
+            logger.info(
+                f"Reused {len(reused_pages)} map pages and {len(reused_routing_pages)} routing pages "
+                f"from unchanged content"
+            )
         logger.info(f"Processed {len(results)} locations in production mode")
+        return ExtractionResult(
+            locations=results,
+            partial=partial_reason is not None,
+            partial_reason=partial_reason,
+            pages_processed=pages_processed,
+            pages_total=pages_total,
+            skipped_pages=skipped_pages,
+            skipped_routing_pages=skipped_routing_pages,
+            reused_pages=reused_pages,
+            reused_routing_pages=reused_routing_pages,
+            text_layer_pages=text_layer_pages,
+            usage=self._job_usage(page_usages, token_budget),
+            model_tiers=self._model_tier_stats(page_usages)
+        )
+    
+    def _build_location_results(
+        self,
+        page_num: int,
+        data: Dict[str, Any],
+        address_dict: Dict[str, str]
+    ) -> List[LocationResult]:
+        results = []
+        for item in data.get("items", []):
+            location_name = item["location_name"]
+            
+            matched_address = None
+            if address_dict:
+                matched_address = self.find_best_address_match(
+                    location_name, address_dict
+                )
+            
+            query = matched_address if matched_address else location_name
+            
+            results.append(
+                LocationResult(
+                    page=page_num,
+                    location_name=location_name,
+                    full_address=matched_address if matched_address else "Not found",
+                    linear_feet=item["linear_feet"],
+                    maps_url=self.google_maps_url(query),
+                )
+            )
         return results
+    
+    @staticmethod
+    def compact_locations(locations: List[LocationResult]) -> Tuple[List[str], CompactLocationColumns]:
+        addresses: List[str] = []
+        address_index: Dict[str, int] = {}
+        columns = CompactLocationColumns(
+            page=[], location_name=[], address_index=[], linear_feet=[], maps_query=[]
+        )
+        
+        for location in locations:
+            index = None
+            if location.full_address != "Not found":
+                index = address_index.get(location.full_address)
+                if index is None:
+                    index = address_index[location.full_address] = len(addresses)
+                    addresses.append(location.full_address)
+            
+            default_query = location.location_name if index is None else location.full_address
+            maps_query = None
+            if location.maps_url != LocationService.google_maps_url(default_query):
+                maps_query = urllib.parse.unquote(
+                    location.maps_url[len(LocationService.MAPS_SEARCH_URL):]
+                )
+            
+            columns.page.append(location.page)
+            columns.location_name.append(location.location_name)
+            columns.address_index.append(index)
+            columns.linear_feet.append(location.linear_feet)
+            columns.maps_query.append(maps_query)
+        
+        return addresses, columns
+    
+    @staticmethod
+    def _job_usage(page_usages: List[PageUsage], token_budget: Optional[int]) -> JobUsage:
+        usage = JobUsage(token_budget=token_budget, pages=page_usages)
+        for page_usage in page_usages:
+            usage.prompt_tokens += page_usage.prompt_tokens
+            usage.completion_tokens += page_usage.completion_tokens
+            usage.total_tokens += page_usage.total_tokens
+            usage.cached_tokens += page_usage.cached_tokens
+            usage.estimated_image_tokens += page_usage.estimated_image_tokens
+        return usage
+    
+    @staticmethod
+    def _model_tier_stats(page_usages: List[PageUsage]) -> List[ModelTierStats]:
+        tiers: Dict[int, ModelTierStats] = {}
+        for page_usage in page_usages:
+            for attempt in page_usage.attempts:
+                stats = tiers.setdefault(attempt.tier, ModelTierStats(tier=attempt.tier, model=attempt.model))
+                stats.attempts += 1
+                stats.total_latency_seconds += attempt.latency_seconds
+                if attempt.accepted:
+                    stats.accepted += 1
+                else:
+                    stats.escalated += 1
+        
+        for stats in tiers.values():
+            stats.hit_rate = round(stats.accepted / stats.attempts, 3)
+            stats.avg_latency_seconds = round(stats.total_latency_seconds / stats.attempts, 3)
+            stats.total_latency_seconds = round(stats.total_latency_seconds, 3)
+            logger.info(
+                f"Model tier {stats.tier} ({stats.model}): {stats.accepted}/{stats.attempts} accepted, "
+                f"avg latency {stats.avg_latency_seconds:.2f}s"
+            )
+        return [tiers[tier] for tier in sorted(tiers)]
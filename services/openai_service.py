@@ -1,16 +1,64 @@
 import json
-from typing import Tuple, Dict, Any
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from PIL import Image
-from openai import OpenAI
+from openai import OpenAI, APITimeoutError
+from models.schemas import TokenUsage, TierAttempt
 from config.settings import get_settings
 from utils.logger import logger
+from utils.job_context import DeadlineExceededError
 from services.pdf_service import PDFService
 
 settings = get_settings()
 
+CascadeResult = Tuple[Dict[str, Any], str, TokenUsage, List[TierAttempt]]
+
+
+class CascadeProgress:
+    """Best result of a running model cascade, readable by a caller that stopped waiting for it."""
+    
+    def __init__(self):
+        self.result: Optional[CascadeResult] = None
+        self.abandoned = False
+    
+    def abandon(self) -> Optional[CascadeResult]:
+        self.abandoned = True
+        return self.result
+
 
 class OpenAIService:
     
+    LOCATION_PROMPT = """
+You are reading a map screenshot.
+
+Extract ALL visible locations that:
+- Look like named places (e.g., "Elliot Norton Park", "Bay Village Garden",
+  "Clarendon Street Playlot")
+- May have a nearby callout showing "X linear feet"
+
+Rules:
+- location_name must match the visible label (fix obvious casing errors).
+- linear_feet: return the numeric value if shown.
+- If no measurement is visible, return null.
+- Do NOT invent or guess locations.
+"""
+    
+    ADDRESS_PROMPT = """
+You are reading a routing document that lists locations with their full addresses.
+
+Extract ALL location entries that show:
+- A location name (e.g., "Union Street Park", "Phillips Street Play Area", "Bay Village Garden")
+- A complete address (e.g., "98 Union St, Boston, MA 02129, USA")
+
+Rules:
+- location_name: Extract the exact name as shown (before the dash or address)
+- full_address: Extract the complete address including street, city, state, zip, and country
+- Match the visible text exactly, fixing only obvious OCR errors
+- Do NOT invent or guess information
+"""
+    
+    COMPLETION_TOKEN_RESERVE = 300
+    
     LOCATION_SCHEMA = {
         "name": "extracted_locations",
         "schema": {
@@ -64,36 +112,58 @@ class OpenAIService:
             self.client = None
             logger.warning("OpenAI client not initialized - API key missing")
     
-    def extract_locations_from_page(self, page_image: Image.Image) -> Tuple[Dict[str, Any], str]:
-        if not self.client:
-            raise RuntimeError("OpenAI client not initialized")
-        
-        image_url = PDFService.pil_to_data_url(page_image)
-        
-        prompt = """
-You are reading a map screenshot.
-
-Extract ALL visible locations that:
-- Look like named places (e.g., "Elliot Norton Park", "Bay Village Garden",
-  "Clarendon Street Playlot")
-- May have a nearby callout showing "X linear feet"
-
-Rules:
-- location_name must match the visible label (fix obvious casing errors).
-- linear_feet: return the numeric value if shown.
-- If no measurement is visible, return null.
-- Do NOT invent or guess locations.
-"""
+    @classmethod
+    def estimate_text_tokens(cls, kind: str) -> int:
+        prompt, schema = cls._prompt_and_schema(kind)
+        return (len(prompt) + len(json.dumps(schema))) // 4 + cls.COMPLETION_TOKEN_RESERVE
+    
+    @classmethod
+    def _prompt_and_schema(cls, kind: str) -> Tuple[str, Dict[str, Any]]:
+        if kind == "addresses":
+            return cls.ADDRESS_PROMPT, cls.ADDRESS_SCHEMA
+        return cls.LOCATION_PROMPT, cls.LOCATION_SCHEMA
+    
+    @staticmethod
+    def usage_from_response(response: Any) -> TokenUsage:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return TokenUsage()
+        details = getattr(usage, "prompt_tokens_details", None)
+        return TokenUsage(
+            prompt_tokens=usage.prompt_tokens or 0,
+            completion_tokens=usage.completion_tokens or 0,
+            total_tokens=usage.total_tokens or 0,
+            cached_tokens=(getattr(details, "cached_tokens", None) or 0) if details else 0
+        )
+    
+    def _create_completion(self, timeout: Optional[float], **kwargs: Any):
+        if timeout is None:
+            return self.client.chat.completions.create(**kwargs)
         
-        logger.info("Sending location extraction request to OpenAI")
-        response = self.client.chat.completions.create(
-            model=settings.MODEL,
+        client = self.client.with_options(timeout=max(timeout, 0.1), max_retries=0)
+        try:
+            return client.chat.completions.create(**kwargs)
+        except APITimeoutError as e:
+            raise DeadlineExceededError(f"OpenAI request exceeded {timeout:.1f}s budget") from e
+    
+    def _request_extraction(
+        self,
+        model: str,
+        prompt: str,
+        schema: Dict[str, Any],
+        image_url: str,
+        detail: str,
+        timeout: Optional[float]
+    ) -> Tuple[str, TokenUsage]:
+        response = self._create_completion(
+            timeout,
+            model=model,
             messages=[
                 {
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": image_url}},
+                        {"type": "image_url", "image_url": {"url": image_url, "detail": detail}},
                     ],
                 }
             ],
@@ -101,62 +171,121 @@ Rules:
             response_format={
                 "type": "json_schema",
                 "json_schema": {
-                    "name": self.LOCATION_SCHEMA["name"],
-                    "schema": self.LOCATION_SCHEMA["schema"],
+                    "name": schema["name"],
+                    "schema": schema["schema"],
                     "strict": True,
                 }
             },
         )
-        
-        raw_json = response.choices[0].message.content
-        data = json.loads(raw_json)
-        logger.info(f"Extracted {len(data.get('items', []))} locations from page")
-        return data, raw_json
+        return response.choices[0].message.content, self.usage_from_response(response)
     
-    def extract_addresses_from_page(self, page_image: Image.Image) -> Tuple[Dict[str, Any], str]:
+    def _extract_from_page(
+        self,
+        kind: str,
+        page_image: Image.Image,
+        timeout: Optional[float],
+        detail: str,
+        validator: Optional[Callable[[Dict[str, Any]], List[str]]],
+        progress: Optional[CascadeProgress] = None
+    ) -> CascadeResult:
         if not self.client:
             raise RuntimeError("OpenAI client not initialized")
         
+        prompt, schema = self._prompt_and_schema(kind)
         image_url = PDFService.pil_to_data_url(page_image)
+        cascade = settings.model_cascade
+        started = time.monotonic()
         
-        prompt = """
-You are reading a routing document that lists locations with their full addresses.
-
-Extract ALL location entries that show:
-- A location name (e.g., "Union Street Park", "Phillips Street Play Area", "Bay Village Garden")
-- A complete address (e.g., "98 Union St, Boston, MA 02129, USA")
-
-Rules:
-- location_name: Extract the exact name as shown (before the dash or address)
-- full_address: Extract the complete address including street, city, state, zip, and country
-- Match the visible text exactly, fixing only obvious OCR errors
-- Do NOT invent or guess information
-"""
+        usage = TokenUsage()
+        attempts: List[TierAttempt] = []
+        best = None
+        for tier, model in enumerate(cascade):
+            if progress and progress.abandoned:
+                break
+            remaining = None if timeout is None else timeout - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0 and best is not None:
+                logger.warning(f"No time left to escalate {kind} page beyond tier {tier - 1}")
+                break
+            
+            logger.info(f"Sending {kind} extraction request to OpenAI - model: {model} (tier {tier})")
+            attempt_started = time.monotonic()
+            try:
+                raw_json, attempt_usage = self._request_extraction(
+                    model, prompt, schema, image_url, detail, remaining
+                )
+            except DeadlineExceededError:
+                if best is None:
+                    raise
+                logger.warning(f"No time left to escalate {kind} page beyond tier {tier - 1}")
+                break
+            latency = time.monotonic() - attempt_started
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens"):
+                setattr(usage, field, getattr(usage, field) + getattr(attempt_usage, field))
+            
+            try:
+                data = json.loads(raw_json)
+                issues = validator(data) if validator else []
+            except (TypeError, ValueError) as e:
+                if tier == len(cascade) - 1 and best is None:
+                    raise
+                data, issues = None, [f"invalid JSON: {str(e)}"]
+            
+            attempts.append(TierAttempt(
+                tier=tier,
+                model=model,
+                latency_seconds=round(latency, 3),
+                accepted=False,
+                issues=issues
+            ))
+            if data is not None and (best is None or len(issues) <= len(best[2])):
+                best = (data, raw_json, issues, len(attempts) - 1)
+            if progress and best is not None:
+                progress.result = self._cascade_result(best, usage, attempts)
+            if not issues:
+                break
+            if tier < len(cascade) - 1:
+                logger.info(f"Escalating {kind} page from {model}: {'; '.join(issues[:3])}")
         
-        logger.info("Sending address extraction request to OpenAI")
-        response = self.client.chat.completions.create(
-            model=settings.MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": image_url}},
-                    ],
-                }
-            ],
-            temperature=0,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": self.ADDRESS_SCHEMA["name"],
-                    "schema": self.ADDRESS_SCHEMA["schema"],
-                    "strict": True,
-                }
-            },
+        data, raw_json, usage, attempts = self._cascade_result(best, usage, attempts)
+        if progress and progress.abandoned:
+            logger.info(f"Discarding late {kind} cascade result - the caller stopped waiting")
+            return data, raw_json, usage, attempts
+        accepted = next(attempt for attempt in attempts if attempt.accepted)
+        logger.info(
+            f"Extracted {len(data.get('items', []))} {kind} from page with {accepted.model} - "
+            f"tokens: {usage.total_tokens} (cached: {usage.cached_tokens})"
         )
-        
-        raw_json = response.choices[0].message.content
-        data = json.loads(raw_json)
-        logger.info(f"Extracted {len(data.get('items', []))} addresses from page")
-        return data, raw_json
+        return data, raw_json, usage, attempts
+    
+    @staticmethod
+    def _cascade_result(
+        best: Tuple[Dict[str, Any], str, List[str], int],
+        usage: TokenUsage,
+        attempts: List[TierAttempt]
+    ) -> CascadeResult:
+        data, raw_json, _, accepted_index = best
+        attempts = [
+            attempt.model_copy(update={"accepted": index == accepted_index})
+            for index, attempt in enumerate(attempts)
+        ]
+        return data, raw_json, usage.model_copy(), attempts
+    
+    def extract_locations_from_page(
+        self,
+        page_image: Image.Image,
+        timeout: Optional[float] = None,
+        detail: str = "high",
+        validator: Optional[Callable[[Dict[str, Any]], List[str]]] = None,
+        progress: Optional[CascadeProgress] = None
+    ) -> CascadeResult:
+        return self._extract_from_page("locations", page_image, timeout, detail, validator, progress)
+    
+    def extract_addresses_from_page(
+        self,
+        page_image: Image.Image,
+        timeout: Optional[float] = None,
+        detail: str = "high",
+        validator: Optional[Callable[[Dict[str, Any]], List[str]]] = None,
+        progress: Optional[CascadeProgress] = None
+    ) -> CascadeResult:
+        return self._extract_from_page("addresses", page_image, timeout, detail, validator, progress)
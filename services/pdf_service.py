@@ -1,30 +1,170 @@
 import io
 import base64
+import ctypes
+import hashlib
+import math
+import threading
 from typing import List, Tuple
 from PIL import Image
 import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from models.schemas import RenderCostEstimate
+from services.token_planner import TokenPlanner
 
 
 class PDFService:
     
+    PDFIUM_LOCK = threading.RLock()
+    
+    BYTES_PER_PIXEL_PEAK = 14
+    
     @staticmethod
     def pdf_to_images(pdf_bytes: bytes, zoom: float, limit: int) -> List[Tuple[int, Image.Image]]:
-        pdf = pdfium.PdfDocument(pdf_bytes)
+        pdf = PDFService.open_document(pdf_bytes)
         
         pages = []
-        scale = zoom
+        for i in range(min(PDFService.page_count(pdf), limit)):
+            pages.append((i + 1, PDFService.render_page(pdf, i, zoom)))
         
-        for i in range(min(len(pdf), limit)):
-            page = pdf[i]
+        PDFService.close_document(pdf)
+        return pages
+    
+    @staticmethod
+    def open_document(pdf_bytes: bytes) -> pdfium.PdfDocument:
+        with PDFService.PDFIUM_LOCK:
+            return pdfium.PdfDocument(pdf_bytes)
+    
+    @staticmethod
+    def page_count(pdf: pdfium.PdfDocument) -> int:
+        with PDFService.PDFIUM_LOCK:
+            return len(pdf)
+    
+    @staticmethod
+    def page_size(pdf: pdfium.PdfDocument, index: int) -> Tuple[float, float]:
+        with PDFService.PDFIUM_LOCK:
+            return pdf.get_page_size(index)
+    
+    @staticmethod
+    def text_boxes(pdf: pdfium.PdfDocument, index: int) -> List[Tuple[str, Tuple[float, float, float, float]]]:
+        """Text runs on a page as (text, (left, bottom, right, top)) in PDF points."""
+        with PDFService.PDFIUM_LOCK:
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                boxes = []
+                for i in range(textpage.count_rects()):
+                    rect = textpage.get_rect(i)
+                    text = textpage.get_text_bounded(*rect).strip()
+                    if text:
+                        boxes.append((text, rect))
+                return boxes
+            finally:
+                textpage.close()
+                page.close()
+    
+    @staticmethod
+    def render_page(pdf: pdfium.PdfDocument, index: int, zoom: float) -> Image.Image:
+        with PDFService.PDFIUM_LOCK:
+            page = pdf[index]
             pil_image = page.render(
-                scale=scale,
+                scale=zoom,
                 rotation=0,
             ).to_pil()
-            pages.append((i + 1, pil_image.convert("RGB")))
             page.close()
+        return pil_image.convert("RGB")
+    
+    @staticmethod
+    def page_fingerprint(pdf: pdfium.PdfDocument, index: int) -> str:
+        """Hash a page's parsed content, resources and boxes without rasterizing it."""
+        digest = hashlib.blake2b(digest_size=20)
+        with PDFService.PDFIUM_LOCK:
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                digest.update(repr((
+                    tuple(round(v, 3) for v in page.get_mediabox()),
+                    tuple(round(v, 3) for v in page.get_cropbox()),
+                    page.get_rotation(),
+                    pdfium_c.FPDFPage_GetAnnotCount(page.raw),
+                )).encode())
+                digest.update(textpage.get_text_range().encode("utf-8", "surrogatepass"))
+                for obj in page.get_objects():
+                    digest.update(PDFService._object_signature(obj))
+            finally:
+                textpage.close()
+                page.close()
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _object_signature(obj: pdfium.PdfObject) -> bytes:
+        fill = [ctypes.c_uint() for _ in range(4)]
+        stroke = [ctypes.c_uint() for _ in range(4)]
+        pdfium_c.FPDFPageObj_GetFillColor(obj.raw, *fill)
+        pdfium_c.FPDFPageObj_GetStrokeColor(obj.raw, *stroke)
         
-        pdf.close()
-        return pages
+        signature = [
+            obj.type,
+            obj.level,
+            tuple(round(v, 3) for v in obj.get_matrix().get()),
+            tuple(round(v, 3) for v in obj.get_bounds()),
+            tuple(c.value for c in fill),
+            tuple(c.value for c in stroke),
+        ]
+        if obj.type == pdfium_c.FPDF_PAGEOBJ_PATH:
+            signature.append(PDFService._path_segments(obj))
+        elif obj.type == pdfium_c.FPDF_PAGEOBJ_TEXT:
+            signature.append(round(PDFService._text_font_size(obj), 3))
+        elif obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+            signature.append(hashlib.blake2b(bytes(obj.get_data()), digest_size=16).hexdigest())
+        return repr(signature).encode()
+    
+    @staticmethod
+    def _path_segments(obj: pdfium.PdfObject) -> Tuple[Tuple[int, float, float, bool], ...]:
+        """Segment geometry, so outlined glyphs and redrawn shapes with the same bounds differ."""
+        x, y = ctypes.c_float(), ctypes.c_float()
+        segments = []
+        for i in range(pdfium_c.FPDFPath_CountSegments(obj.raw)):
+            segment = pdfium_c.FPDFPath_GetPathSegment(obj.raw, i)
+            pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+            segments.append((
+                pdfium_c.FPDFPathSegment_GetType(segment),
+                round(x.value, 3),
+                round(y.value, 3),
+                bool(pdfium_c.FPDFPathSegment_GetClose(segment))
+            ))
+        return tuple(segments)
+    
+    @staticmethod
+    def _text_font_size(obj: pdfium.PdfObject) -> float:
+        size = ctypes.c_float()
+        pdfium_c.FPDFTextObj_GetFontSize(obj.raw, size)
+        return size.value
+    
+    @staticmethod
+    def close_document(pdf: pdfium.PdfDocument) -> None:
+        with PDFService.PDFIUM_LOCK:
+            pdf.close()
+    
+    @staticmethod
+    def estimate_render_cost(pdf_bytes: bytes, zoom: float, limit: int) -> RenderCostEstimate:
+        with PDFService.PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_bytes)
+            try:
+                sizes = [pdf.get_page_size(i) for i in range(min(len(pdf), limit))]
+            finally:
+                pdf.close()
+        
+        page_pixels = [
+            math.prod(TokenPlanner.effective_high_size(width * zoom, height * zoom))
+            for width, height in sizes
+        ]
+        peak_pixels = max(page_pixels, default=0)
+        return RenderCostEstimate(
+            pages=len(page_pixels),
+            total_pixels=sum(page_pixels),
+            peak_pixels=peak_pixels,
+            estimated_bytes=len(pdf_bytes) + peak_pixels * PDFService.BYTES_PER_PIXEL_PEAK
+        )
     
     @staticmethod
     def pil_to_data_url(pil_img: Image.Image) -> str:
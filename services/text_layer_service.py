@@ -0,0 +1,167 @@
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pypdfium2 as pdfium
+from services.pdf_service import PDFService
+
+Box = Tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """Uniform grid over PDF point space for nearest-box lookups."""
+    
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._boxes: List[Box] = []
+    
+    def _cell_range(self, box: Box) -> Iterator[Tuple[int, int]]:
+        left, bottom, right, top = box
+        for cx in range(math.floor(left / self.cell_size), math.floor(right / self.cell_size) + 1):
+            for cy in range(math.floor(bottom / self.cell_size), math.floor(top / self.cell_size) + 1):
+                yield cx, cy
+    
+    def insert(self, box: Box) -> int:
+        box_id = len(self._boxes)
+        self._boxes.append(box)
+        for cell in self._cell_range(box):
+            self._cells[cell].append(box_id)
+        return box_id
+    
+    @staticmethod
+    def distance(a: Box, b: Box) -> float:
+        dx = max(b[0] - a[2], a[0] - b[2], 0.0)
+        dy = max(b[1] - a[3], a[1] - b[3], 0.0)
+        return math.hypot(dx, dy)
+    
+    def within(self, box: Box, radius: float) -> List[Tuple[float, int]]:
+        left, bottom, right, top = box
+        search = (left - radius, bottom - radius, right + radius, top + radius)
+        
+        seen = set()
+        matches = []
+        for cell in self._cell_range(search):
+            for box_id in self._cells.get(cell, ()):
+                if box_id in seen:
+                    continue
+                seen.add(box_id)
+                distance = self.distance(box, self._boxes[box_id])
+                if distance <= radius:
+                    matches.append((distance, box_id))
+        return sorted(matches)
+
+
+class TextLayerService:
+    """Reads location labels and linear-feet callouts from a page's text layer without rendering it."""
+    
+    CALLOUT_PATTERN = re.compile(
+        r"(?P<value>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*"
+        r"(?:linear\s*(?:feet|foot|ft\.?)|lin\.?\s*ft\.?|l\.?f\.?)(?![a-z])",
+        re.IGNORECASE
+    )
+    PLACE_NAME_PATTERN = re.compile(
+        r"\b(?:park|garden|playlot|playground|play\s+area|tot\s+lot|square|plaza|common|green|"
+        r"field|mall|reservation|cemetery|courtyard)$",
+        re.IGNORECASE
+    )
+    MIN_LABEL_LETTERS = 3
+    LINE_MERGE_GAP = 0.6
+    
+    def __init__(self, max_label_distance: float = 72.0):
+        self.max_label_distance = max_label_distance
+    
+    @staticmethod
+    def clean_label(text: str) -> str:
+        text = re.sub(r"\s+", " ", text).strip(" -–—:,;")
+        if text.isupper():
+            text = text.title()
+        return text
+    
+    def _is_label(self, text: str) -> bool:
+        return sum(c.isalpha() for c in text) >= self.MIN_LABEL_LETTERS
+    
+    def _merge_label_lines(self, labels: List[Tuple[str, Box]]) -> List[Tuple[str, Box]]:
+        labels = sorted(labels, key=lambda label: (-label[1][3], label[1][0]))
+        merged: List[Tuple[str, Box]] = []
+        
+        for text, box in labels:
+            for i in range(len(merged) - 1, -1, -1):
+                prev_text, prev_box = merged[i]
+                line_height = min(prev_box[3] - prev_box[1], box[3] - box[1])
+                gap = prev_box[1] - box[3]
+                overlaps = box[0] < prev_box[2] and prev_box[0] < box[2]
+                if overlaps and 0 <= gap <= line_height * self.LINE_MERGE_GAP:
+                    merged[i] = (
+                        f"{prev_text} {text}",
+                        (min(prev_box[0], box[0]), box[1], max(prev_box[2], box[2]), prev_box[3])
+                    )
+                    break
+            else:
+                merged.append((text, box))
+        return merged
+    
+    def extract_locations(self, pdf: pdfium.PdfDocument, index: int) -> Optional[Dict[str, Any]]:
+        """Return `{"items": [...]}` when every callout resolves to a label, else None.
+        
+        Unpaired labels are usually titles, street names or legend text and are ignored, but one that
+        reads like a place name may be a location the vision model would report with
+        `linear_feet: null`, so such pages are left to vision rather than dropping it.
+        """
+        boxes = PDFService.text_boxes(pdf, index)
+        if not boxes:
+            return None
+        
+        callouts: List[Tuple[float, Box]] = []
+        items: List[Dict[str, Any]] = []
+        labels: List[Tuple[str, Box]] = []
+        
+        for text, box in boxes:
+            match = self.CALLOUT_PATTERN.search(text)
+            if not match:
+                if self._is_label(text):
+                    labels.append((text, box))
+                continue
+            
+            value = float(match.group("value").replace(",", ""))
+            inline_label = self.clean_label(text[:match.start()])
+            if self._is_label(inline_label):
+                items.append({"location_name": inline_label, "linear_feet": value})
+            else:
+                callouts.append((value, box))
+        
+        if not callouts and not items:
+            return None
+        
+        labels = self._merge_label_lines(labels)
+        grid = SpatialGrid(cell_size=self.max_label_distance)
+        for _, box in labels:
+            grid.insert(box)
+        
+        candidates = sorted(
+            (distance, callout_id, label_id)
+            for callout_id, (_, box) in enumerate(callouts)
+            for distance, label_id in grid.within(box, self.max_label_distance)
+        )
+        
+        assigned_callouts = set()
+        assigned_labels = set()
+        for _, callout_id, label_id in candidates:
+            if callout_id in assigned_callouts or label_id in assigned_labels:
+                continue
+            assigned_callouts.add(callout_id)
+            assigned_labels.add(label_id)
+            items.append({
+                "location_name": self.clean_label(labels[label_id][0]),
+                "linear_feet": callouts[callout_id][0]
+            })
+        
+        if len(assigned_callouts) < len(callouts):
+            return None
+        if any(
+            self.PLACE_NAME_PATTERN.search(self.clean_label(text))
+            for label_id, (text, _) in enumerate(labels)
+            if label_id not in assigned_labels
+        ):
+            return None
+        return {"items": items}
@@ -0,0 +1,97 @@
+import math
+from typing import Optional, Tuple
+from models.schemas import ImagePlan
+
+
+class TokenBudget:
+    
+    def __init__(self, total: Optional[int]):
+        self.total = total
+        self.spent = 0
+    
+    def allowance(self, pages_left: int) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(self.total - self.spent, 0) // max(pages_left, 1)
+    
+    def spend(self, tokens: int) -> None:
+        self.spent += tokens
+
+
+class TokenPlanner:
+    """Estimates vision input tokens and picks image detail/resolution to fit a token allowance.
+    
+    High detail images are scaled by the provider to fit 2048x2048, then so the shortest side is
+    at most 768px, and billed per 512px tile on top of a base cost. Low detail is a flat base cost
+    for an image of at most 512x512.
+    """
+    
+    MODEL_IMAGE_COSTS = {
+        "gpt-4o-mini": (2833, 5667),
+        "gpt-4o": (85, 170),
+        "gpt-4-turbo": (85, 170),
+    }
+    DEFAULT_IMAGE_COST = (85, 170)
+    
+    HIGH_DETAIL_MAX_SIDE = 2048
+    HIGH_DETAIL_SHORT_SIDE = 768
+    LOW_DETAIL_MAX_SIDE = 512
+    TILE_SIZE = 512
+    
+    def __init__(self, model: str, detail: str = "auto"):
+        self.model = model
+        self.detail = detail
+        self.base_tokens, self.tile_tokens = self.image_costs(model)
+    
+    @classmethod
+    def image_costs(cls, model: str) -> Tuple[int, int]:
+        for prefix in sorted(cls.MODEL_IMAGE_COSTS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return cls.MODEL_IMAGE_COSTS[prefix]
+        return cls.DEFAULT_IMAGE_COST
+    
+    @classmethod
+    def effective_high_size(cls, width: float, height: float) -> Tuple[int, int]:
+        scale = min(1.0, cls.HIGH_DETAIL_MAX_SIDE / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, cls.HIGH_DETAIL_SHORT_SIDE / min(width, height))
+        return max(int(width * scale), 1), max(int(height * scale), 1)
+    
+    def high_detail_tokens(self, width: float, height: float) -> int:
+        width, height = self.effective_high_size(width, height)
+        tiles = math.ceil(width / self.TILE_SIZE) * math.ceil(height / self.TILE_SIZE)
+        return self.base_tokens + self.tile_tokens * tiles
+    
+    def _low_detail_plan(self, width: float, height: float) -> ImagePlan:
+        scale = min(1.0, self.LOW_DETAIL_MAX_SIDE / max(width, height))
+        return ImagePlan(
+            detail="low",
+            width=max(int(width * scale), 1),
+            height=max(int(height * scale), 1),
+            estimated_tokens=self.base_tokens
+        )
+    
+    def plan(self, width: float, height: float, allowance: Optional[int] = None) -> ImagePlan:
+        if self.detail == "low":
+            return self._low_detail_plan(width, height)
+        
+        width, height = self.effective_high_size(width, height)
+        tokens = self.high_detail_tokens(width, height)
+        if self.detail == "high" or allowance is None or tokens <= allowance:
+            return ImagePlan(detail="high", width=width, height=height, estimated_tokens=tokens)
+        
+        tile_boundaries = sorted(
+            {
+                tiles * self.TILE_SIZE / side
+                for side in (width, height)
+                for tiles in range(1, math.ceil(side / self.TILE_SIZE))
+            },
+            reverse=True
+        )
+        for scale in tile_boundaries:
+            scaled_width, scaled_height = max(int(width * scale), 1), max(int(height * scale), 1)
+            tokens = self.high_detail_tokens(scaled_width, scaled_height)
+            if tokens <= allowance:
+                return ImagePlan(detail="high", width=scaled_width, height=scaled_height, estimated_tokens=tokens)
+        
+        return self._low_detail_plan(width, height)
@@ -0,0 +1,24 @@
+import ctypes
+import io
+from typing import List, Tuple
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+TextRun = Tuple[float, float, str]
+
+
+def make_text_pdf(pages: List[List[TextRun]], width: float = 612, height: float = 792) -> bytes:
+    """Build a PDF whose pages hold the given `(x, y, text)` runs as real text objects."""
+    pdf = pdfium.PdfDocument.new()
+    for runs in pages:
+        page = pdf.new_page(width, height)
+        for x, y, text in runs:
+            obj = pdfium_c.FPDFPageObj_NewTextObj(pdf.raw, b"Helvetica", 12.0)
+            buffer = ctypes.create_string_buffer(f"{text}\0".encode("utf-16-le"))
+            pdfium_c.FPDFText_SetText(obj, ctypes.cast(buffer, ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+            pdfium_c.FPDFPageObj_Transform(obj, 1, 0, 0, 1, x, y)
+            pdfium_c.FPDFPage_InsertObject(page.raw, obj)
+        page.gen_content()
+    output = io.BytesIO()
+    pdf.save(output)
+    return output.getvalue()
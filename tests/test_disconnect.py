@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable
+import main
+from config.settings import get_settings
+from models.schemas import TokenUsage
+from routes.location_routes import controller
+from tests.helpers import make_text_pdf
+
+settings = get_settings()
+
+BOUNDARY = "disconnect-test-boundary"
+
+
+def make_map_pdf(pages: int) -> bytes:
+    marker = uuid.uuid4().hex
+    return make_text_pdf([[(72, 700, f"Park {index} {marker}")] for index in range(pages)])
+
+
+def multipart_body(pdf_bytes: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="map_pdf"; filename="map.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + pdf_bytes + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post_and_disconnect(body: bytes, disconnect_when: Callable[[], Awaitable[None]]) -> list:
+    messages = []
+    body_sent = False
+    disconnected = asyncio.Event()
+    
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        messages.append(message)
+    
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/locations/extract",
+        "raw_path": b"/api/v1/locations/extract",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"x-api-key", settings.API_KEY.encode()),
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    
+    request = asyncio.create_task(main.app(scope, receive, send))
+    await disconnect_when()
+    disconnected.set()
+    await asyncio.wait_for(request, timeout=10)
+    return messages
+
+
+def test_client_disconnect_cancels_extraction_through_middleware_stack(monkeypatch):
+    calls = []
+    
+    def request_extraction(model, prompt, schema, image_url, detail, timeout):
+        calls.append(model)
+        time.sleep(0.3)
+        return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": 12.0}]}), TokenUsage(total_tokens=10)
+    
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "TEXT_LAYER_ENABLED", False)
+    monkeypatch.setattr(controller.service.openai_service, "client", object())
+    monkeypatch.setattr(controller.service.openai_service, "_request_extraction", request_extraction)
+    
+    messages = asyncio.run(post_and_disconnect(multipart_body(make_map_pdf(8)), lambda: asyncio.sleep(1.0)))
+    
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    assert start["status"] == 499
+    assert len(calls) < 8
+
+
+def test_client_disconnect_stops_model_cascade_escalation(monkeypatch):
+    calls = []
+    tier_zero_started = threading.Event()
+    
+    def request_extraction(model, prompt, schema, image_url, detail, timeout):
+        calls.append(model)
+        if model == "cheap":
+            tier_zero_started.set()
+            time.sleep(0.8)
+            return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": -5}]}), TokenUsage(total_tokens=10)
+        return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": 12.0}]}), TokenUsage(total_tokens=10)
+    
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "TEXT_LAYER_ENABLED", False)
+    monkeypatch.setattr(settings, "MODEL_CASCADE", "cheap,strong")
+    monkeypatch.setattr(controller.service.openai_service, "client", object())
+    monkeypatch.setattr(controller.service.openai_service, "_request_extraction", request_extraction)
+    
+    async def tier_zero_in_flight():
+        while not tier_zero_started.is_set():
+            await asyncio.sleep(0.01)
+    
+    async def scenario():
+        messages = await post_and_disconnect(multipart_body(make_map_pdf(1)), tier_zero_in_flight)
+        await asyncio.sleep(1.0)
+        return messages
+    
+    messages = asyncio.run(scenario())
+    
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    assert start["status"] == 499
+    assert calls == ["cheap"]
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+import pytest
+from config.settings import get_settings
+from models.schemas import TokenUsage
+from repositories.job_repository import JobRepository
+from services.job_service import JobService
+from tests.helpers import make_text_pdf
+
+settings = get_settings()
+
+
+def create_job(repository: JobRepository, routing_pages: int = 0, map_pages: int = 1) -> str:
+    job_id = uuid.uuid4().hex
+    tasks = [{"kind": "addresses", "page_index": i, "phase": 0} for i in range(routing_pages)]
+    tasks += [{"kind": "locations", "page_index": i, "phase": 1} for i in range(map_pages)]
+    repository.create_job(job_id, {"zoom": 2.0, "max_pages": 30, "token_budget": None}, {"map": b"%PDF"}, tasks)
+    return job_id
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return JobRepository(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_expired_lease_is_leased_again(repository):
+    create_job(repository)
+    
+    first = repository.lease_task("w1", lease_seconds=0.05, max_attempts=3)
+    assert repository.lease_task("w2", lease_seconds=0.05, max_attempts=3) is None
+    
+    time.sleep(0.1)
+    second = repository.lease_task("w2", lease_seconds=60, max_attempts=3)
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+    assert not repository.complete_task(first["id"], "w1", {"data": None})
+    assert repository.complete_task(second["id"], "w2", {"data": None})
+
+
+def test_failed_task_is_retried_until_max_attempts(repository):
+    job_id = create_job(repository)
+    
+    task = repository.lease_task("w1", lease_seconds=60, max_attempts=2)
+    repository.fail_task(task["id"], "w1", "boom", max_attempts=2)
+    assert repository.get_job(job_id)["task_counts"] == {"pending": 1}
+    
+    task = repository.lease_task("w1", lease_seconds=60, max_attempts=2)
+    repository.fail_task(task["id"], "w1", "boom", max_attempts=2)
+    assert repository.get_job(job_id)["task_counts"] == {"failed": 1}
+    assert repository.lease_task("w1", lease_seconds=60, max_attempts=2) is None
+    assert repository.claim_finalizable_job(lease_seconds=60) == job_id
+
+
+def test_expired_lease_on_final_attempt_fails_the_task(repository):
+    job_id = create_job(repository)
+    
+    repository.lease_task("w1", lease_seconds=0.05, max_attempts=1)
+    time.sleep(0.1)
+    assert repository.lease_task("w2", lease_seconds=60, max_attempts=1) is None
+    assert repository.get_job(job_id)["task_counts"] == {"failed": 1}
+
+
+def test_routing_tasks_run_before_map_tasks(repository):
+    job_id = create_job(repository, routing_pages=1, map_pages=2)
+    
+    routing = repository.lease_task("w1", lease_seconds=60, max_attempts=3)
+    assert routing["kind"] == "addresses"
+    assert repository.lease_task("w2", lease_seconds=60, max_attempts=3) is None
+    assert repository.claim_finalizable_job(lease_seconds=60) is None
+    
+    repository.complete_task(routing["id"], "w1", {"data": None})
+    kinds = [repository.lease_task("w2", lease_seconds=60, max_attempts=3)["kind"] for _ in range(2)]
+    assert kinds == ["locations", "locations"]
+    assert repository.claim_finalizable_job(lease_seconds=60) is None
+    
+    assert repository.get_job(job_id)["task_counts"] == {"done": 1, "leased": 2}
+
+
+@pytest.fixture
+def job_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "TEXT_LAYER_ENABLED", False)
+    monkeypatch.setattr(settings, "JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+    service = JobService()
+    monkeypatch.setattr(service.location_service.openai_service, "client", object())
+    return service
+
+
+def map_pdf(pages: int) -> bytes:
+    marker = uuid.uuid4().hex
+    return make_text_pdf([[(72, 700, f"Park {index} {marker}")] for index in range(pages)])
+
+
+async def drain(service: JobService) -> None:
+    while await service.process_next("worker"):
+        pass
+
+
+def test_page_failing_every_attempt_is_skipped_and_result_partial(job_service, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+    calls = []
+    
+    def request_extraction(model, prompt, schema, image_url, detail, timeout):
+        calls.append(model)
+        if len(calls) > 1:
+            raise RuntimeError("upstream error")
+        return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": 1.0}]}), TokenUsage(total_tokens=1)
+    
+    monkeypatch.setattr(job_service.location_service.openai_service, "_request_extraction", request_extraction)
+    
+    async def scenario():
+        job = await job_service.submit(map_pdf(2), zoom=2.0)
+        await drain(job_service)
+        return await job_service.get_status(job.job_id), await job_service.get_result(job.job_id)
+    
+    status, result = asyncio.run(scenario())
+    
+    assert len(calls) == 3
+    assert status.status == "completed"
+    assert (status.pages_done, status.pages_failed) == (1, 1)
+    assert result.partial
+    assert result.skipped_pages == [2]
+    assert [location.page for location in result.locations] == [1]
+
+
+def test_lease_is_renewed_while_a_page_runs(job_service, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 0.3)
+    in_flight = threading.Event()
+    
+    def request_extraction(model, prompt, schema, image_url, detail, timeout):
+        in_flight.set()
+        time.sleep(0.8)
+        return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": 1.0}]}), TokenUsage(total_tokens=1)
+    
+    monkeypatch.setattr(job_service.location_service.openai_service, "_request_extraction", request_extraction)
+    
+    async def scenario():
+        job = await job_service.submit(map_pdf(1), zoom=2.0)
+        run = asyncio.create_task(job_service.process_next("w1"))
+        while not in_flight.is_set():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.5)
+        stolen = job_service.repository.lease_task("w2", lease_seconds=60, max_attempts=3)
+        await run
+        return job, stolen
+    
+    job, stolen = asyncio.run(scenario())
+    
+    assert stolen is None
+    assert job_service.repository.get_job(job.job_id)["task_counts"] == {"done": 1}
+
+
+def test_worker_that_loses_its_lease_abandons_the_page(job_service, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 0.3)
+    in_flight = threading.Event()
+    
+    def request_extraction(model, prompt, schema, image_url, detail, timeout):
+        in_flight.set()
+        time.sleep(1.0)
+        return json.dumps({"items": [{"location_name": "Statler Park", "linear_feet": 1.0}]}), TokenUsage(total_tokens=1)
+    
+    monkeypatch.setattr(job_service.location_service.openai_service, "_request_extraction", request_extraction)
+    
+    async def scenario():
+        job = await job_service.submit(map_pdf(1), zoom=2.0)
+        run = asyncio.create_task(job_service.process_next("w1"))
+        while not in_flight.is_set():
+            await asyncio.sleep(0.01)
+        with job_service.repository._connect() as conn:
+            conn.execute("UPDATE tasks SET worker_id = 'w2' WHERE job_id = ?", (job.job_id,))
+        started = time.monotonic()
+        await run
+        return job, time.monotonic() - started
+    
+    job, elapsed = asyncio.run(scenario())
+    
+    assert elapsed < 0.6
+    
+    tasks = job_service.repository.task_results(job.job_id)
+    assert [task["status"] for task in tasks] == ["leased"]
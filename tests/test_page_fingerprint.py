@@ -0,0 +1,37 @@
+import io
+from typing import List, Tuple
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from services.pdf_service import PDFService
+
+
+def make_path_pdf(shapes: List[List[Tuple[float, float]]]) -> pdfium.PdfDocument:
+    pdf = pdfium.PdfDocument.new()
+    for points in shapes:
+        page = pdf.new_page(612, 792)
+        path = pdfium_c.FPDFPageObj_CreateNewPath(*points[0])
+        for point in points[1:]:
+            pdfium_c.FPDFPath_LineTo(path, *point)
+        pdfium_c.FPDFPath_Close(path)
+        pdfium_c.FPDFPath_SetDrawMode(path, pdfium_c.FPDF_FILLMODE_ALTERNATE, 0)
+        pdfium_c.FPDFPage_InsertObject(page.raw, path)
+        page.gen_content()
+    output = io.BytesIO()
+    pdf.save(output)
+    return pdfium.PdfDocument(output.getvalue())
+
+
+SQUARE = [(100, 100), (200, 100), (200, 200), (100, 200)]
+DIAMOND = [(150, 100), (200, 150), (150, 200), (100, 150)]
+
+
+def test_fingerprint_is_stable_for_identical_pages():
+    pdf = make_path_pdf([SQUARE, SQUARE])
+    assert PDFService.page_fingerprint(pdf, 0) == PDFService.page_fingerprint(pdf, 1)
+
+
+def test_fingerprint_changes_with_path_geometry_inside_same_bounds():
+    pdf = make_path_pdf([SQUARE, DIAMOND])
+    page_bounds = [next(pdf[i].get_objects()).get_bounds() for i in range(2)]
+    assert page_bounds[0] == page_bounds[1]
+    assert PDFService.page_fingerprint(pdf, 0) != PDFService.page_fingerprint(pdf, 1)
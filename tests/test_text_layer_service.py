@@ -0,0 +1,32 @@
+import pypdfium2 as pdfium
+from services.text_layer_service import TextLayerService
+from tests.helpers import make_text_pdf
+
+MAP_FURNITURE = [
+    (72, 760, "Boston Parks Maintenance Routes"),
+    (400, 420, "Tremont Street"),
+    (300, 80, "Legend"),
+    (450, 60, "Scale 1:2400"),
+]
+
+
+def extract(runs):
+    pdf = pdfium.PdfDocument(make_text_pdf([runs]))
+    try:
+        return TextLayerService().extract_locations(pdf, 0)
+    finally:
+        pdf.close()
+
+
+def test_callouts_resolve_locally_despite_title_streets_and_legend():
+    result = extract([(72, 600, "Elliot Norton Park"), (72, 580, "1406.6 linear feet")] + MAP_FURNITURE)
+    assert result == {"items": [{"location_name": "Elliot Norton Park", "linear_feet": 1406.6}]}
+
+
+def test_unpaired_place_name_is_left_to_vision():
+    runs = [(72, 600, "Elliot Norton Park"), (72, 580, "1406.6 linear feet"), (400, 250, "Bay Village Garden")]
+    assert extract(runs + MAP_FURNITURE) is None
+
+
+def test_unresolved_callout_is_left_to_vision():
+    assert extract([(300, 300, "1406.6 linear feet")] + MAP_FURNITURE[1:]) is None
@@ -1,3 +1,12 @@
 from .logger import logger, setup_logger
+from .job_context import JobContext, JobCancelledError, DeadlineExceededError
+from .responses import ModelJSONResponse
 
-__all__ = ["logger", "setup_logger"]
+__all__ = [
+    "logger",
+    "setup_logger",
+    "JobContext",
+    "JobCancelledError",
+    "DeadlineExceededError",
+    "ModelJSONResponse"
+]
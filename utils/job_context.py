@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+from starlette.concurrency import run_in_threadpool
+from utils.logger import logger
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+class JobContext:
+    """Carries client-disconnect cancellation and an optional deadline through a job."""
+    
+    def __init__(
+        self,
+        deadline_seconds: Optional[float] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_interval: float = 0.5,
+        min_page_seconds: float = 0.0
+    ):
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self._is_disconnected = is_disconnected
+        self._poll_interval = poll_interval
+        self._min_page_seconds = min_page_seconds
+        self._cancelled = asyncio.Event()
+        self._watcher: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> "JobContext":
+        if self._is_disconnected:
+            self._watcher = asyncio.create_task(self._watch_disconnect())
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+    
+    async def _watch_disconnect(self) -> None:
+        while not self._cancelled.is_set():
+            if await self._is_disconnected():
+                logger.warning("Client disconnected - cancelling job")
+                self.cancel()
+                return
+            await asyncio.sleep(self._poll_interval)
+    
+    def cancel(self) -> None:
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+    
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def page_timeout(self, pages_left: int) -> Optional[float]:
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+        return min(max(remaining / max(pages_left, 1), self._min_page_seconds), remaining)
+    
+    def check(self) -> None:
+        if self.cancelled:
+            raise JobCancelledError("Job cancelled")
+        if self.expired:
+            raise DeadlineExceededError("Job deadline exceeded")
+    
+    async def wait(self, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        self.check()
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        
+        work = asyncio.ensure_future(awaitable)
+        cancelled = asyncio.ensure_future(self._cancelled.wait())
+        try:
+            done, _ = await asyncio.wait(
+                {work, cancelled},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            cancelled.cancel()
+        
+        if work in done:
+            return work.result()
+        
+        work.add_done_callback(lambda task: task.cancelled() or task.exception())
+        work.cancel()
+        if self.cancelled:
+            raise JobCancelledError("Job cancelled")
+        raise DeadlineExceededError("Step deadline exceeded")
+    
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        return await self.wait(run_in_threadpool(func, *args, **kwargs), timeout=timeout)
@@ -0,0 +1,13 @@
+from typing import Any
+from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+
+
+class ModelJSONResponse(JSONResponse):
+    """Serializes an already-built Pydantic model straight to JSON bytes, skipping FastAPI's
+    response-model revalidation and jsonable_encoder pass."""
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return super().render(content)
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from config.settings import get_settings
+from services.job_service import JobService
+from utils.logger import logger
+
+settings = get_settings()
+
+
+async def run_worker(worker_id: str, poll_interval: float, stop: asyncio.Event) -> None:
+    service = JobService()
+    logger.info(f"Worker {worker_id} started - queue: {settings.JOBS_DB_PATH}")
+    
+    while not stop.is_set():
+        try:
+            busy = await service.process_next(worker_id)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} queue error: {str(e)}", exc_info=True)
+            busy = False
+        
+        if not busy:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    logger.info(f"Worker {worker_id} stopped")
+
+
+def worker_main(poll_interval: float) -> None:
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    
+    async def main() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await run_worker(worker_id, poll_interval, stop)
+    
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued extraction jobs")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run on this host")
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL,
+        help="Seconds to wait before polling an idle queue again"
+    )
+    args = parser.parse_args()
+    
+    if args.processes <= 1:
+        worker_main(args.poll_interval)
+    else:
+        processes = [
+            multiprocessing.Process(target=worker_main, args=(args.poll_interval,))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        
+        def forward(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    os.kill(process.pid, signum)
+        
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, forward)
+        for process in processes:
+            process.join()